@@ -0,0 +1 @@
+"""Benchmarks for the bot's caches and searches."""
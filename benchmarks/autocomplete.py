@@ -0,0 +1,88 @@
+"""Compare card autocomplete using the search index with scanning every card.
+
+Misspelt queries, which the scan can't answer, are timed on their own.
+
+Run from the repository root with `python -m benchmarks.autocomplete`.
+A real api response can be used with `--cards`, otherwise cards with generated names are used.
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from json import loads
+from pathlib import Path
+from random import Random
+from timeit import timeit
+
+from benchmarks.universe_memory import fake_cards
+from bot.util.datagen import Card, parse_cards
+from bot.util.search import SearchIndex
+
+WORDS = (
+    "Bdubs", "Cleo", "Docm", "Etho", "False", "Grian", "Impulse", "Iskall", "Joe", "Keralis",
+    "Mumbo", "Scar", "Stress", "Tango", "Xisuma", "Zedaph", "Diamond", "Golden", "Shield",
+    "Sword", "Bow", "Totem", "Chest", "Lead", "Mending", "Thorns", "Water", "Lava", "Bucket",
+)  # fmt: skip
+
+
+def scan(cards: list[Card], query: str, limit: int) -> list[str]:
+    """Autocomplete by checking every card, as was done before the index.
+
+    Args:
+    ----
+    cards (list): The cards to search
+    query (str): The text typed so far
+    limit (int): The most names to return
+    """
+    if not query:
+        return [card.rarityName for card in cards[:limit]]
+    return [card.rarityName for card in cards if query.lower() in card.rarityName.lower()][:limit]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--card-count", type=int, default=300, help="generated cards")
+    parser.add_argument("--cards", type=Path, help="a saved /cards api response")
+    parser.add_argument("--runs", type=int, default=2000, help="times to run each query")
+    args = parser.parse_args()
+
+    if args.cards:
+        data = loads(args.cards.read_text())
+    else:
+        rng = Random(0)  # noqa: S311
+        data = fake_cards(args.card_count)
+        for card in data:
+            card["name"] = " ".join(rng.sample(WORDS, 2))
+    cards = parse_cards(data)
+    index = SearchIndex((card.rarityName, card) for card in cards)
+
+    # Every prefix of a few names, as if typed one key at a time
+    queries = [name[:end] for name in ("Etho", "golden sw", "Rare") for end in range(len(name) + 1)]
+    total_scan = total_index = 0.0
+    print(f"{'query':<12}{'scan':>12}{'index':>12}")
+    for query in queries:
+        indexed = [card.rarityName for card in index.search(query, 25, fuzzy=False)]
+        assert set(indexed) <= set(scan(cards, query, len(cards)))  # noqa: S101
+        scan_time = timeit(lambda: scan(cards, query, 25), number=args.runs) / args.runs  # noqa: B023
+        index_time = (
+            timeit(lambda: index.search(query, 25, fuzzy=False), number=args.runs)  # noqa: B023
+            / args.runs
+        )
+        total_scan += scan_time
+        total_index += index_time
+        print(f"{query!r:<12}{scan_time * 1e6:>10.1f}us{index_time * 1e6:>10.1f}us")
+    print(
+        f"{'mean':<12}{total_scan / len(queries) * 1e6:>10.1f}us"
+        + f"{total_index / len(queries) * 1e6:>10.1f}us"
+    )
+
+    print(f"\n{'misspelt':<16}{'fuzzy':>10}{'results':>10}")
+    for query in ("Etoh", "grain", "goldne swrod", "ishkall", "xisum"):
+        fuzzy_time = timeit(lambda: index.search(query, 25), number=args.runs) / args.runs  # noqa: B023
+        results = len(index.search(query, 25))
+        print(f"{query!r:<16}{fuzzy_time * 1e6:>8.1f}us{results:>10}")
+
+
+if __name__ == "__main__":
+    main()
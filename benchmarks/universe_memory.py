@@ -0,0 +1,131 @@
+"""Measure the memory used by the card and achievement universes of many servers.
+
+Run from the repository root with `python -m benchmarks.universe_memory`.
+Real api responses can be used with `--cards` and `--achievements`, otherwise data
+shaped like the hc-tcg api is generated.
+"""
+
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from argparse import ArgumentParser
+from json import dumps, loads
+from pathlib import Path
+from typing import Any
+
+from bot.util.datagen import parse_achievements, parse_cards
+
+TYPES = ("miner", "terraform", "speedrunner", "pvp", "builder", "balanced", "explorer", "farm")
+RARITIES = ("common", "rare", "ultra_rare")
+
+
+def fake_cards(count: int) -> list[dict[str, Any]]:
+    """Generate card data shaped like the api response.
+
+    Args:
+    ----
+    count (int): The number of cards to generate
+    """
+    cards: list[dict[str, Any]] = []
+    for i in range(count):
+        card: dict[str, Any] = {
+            "id": f"card_{i}_{RARITIES[i % 3]}",
+            "tokens": i % 4,
+            "images": {
+                "default": f"/images/cards/card_{i}.png",
+                "with-token-cost": f"/images/cards/card_{i}_tokens.png",
+            },
+            "rarity": RARITIES[i % 3],
+            "name": f"Card {i}",
+        }
+        if i % 3 == 0:
+            attack = {
+                "name": "Attack",
+                "power": "Flip a coin. If heads, do an additional 20hp damage." * (i % 2),
+                "damage": 40 + i % 5 * 10,
+                "cost": [TYPES[i % len(TYPES)], "any"],
+            }
+            card |= {
+                "category": "hermit",
+                "type": TYPES[i % len(TYPES)],
+                "health": 250 + i % 6 * 10,
+                "primary": attack | {"power": None},
+                "secondary": attack,
+            }
+        elif i % 3 == 1:
+            card |= {
+                "category": "attach" if i % 2 else "single_use",
+                "description": "When attached, prevents damage from the opponent's attacks. " * 2,
+            }
+        else:
+            card |= {"category": "item", "energy": [TYPES[i % len(TYPES)]] * (1 + i % 2)}
+        cards.append(card)
+    return cards
+
+
+def fake_achievements(count: int) -> list[dict[str, Any]]:
+    """Generate achievement data shaped like the api response.
+
+    Args:
+    ----
+    count (int): The number of achievement levels to generate
+    """
+    return [
+        {
+            "achievementId": f"achievement_{i // 3}",
+            "name": f"Achievement {i // 3}",
+            "description": "Win games using a deck containing only one type of hermit.",
+            "steps": 10 ** (i % 3),
+            "index": i % 3,
+            "maxIndex": 2,
+            "preview": {"image": f"/images/achievements/{i // 3}.png", "borderColor": "#f2c94c"},
+        }
+        for i in range(count)
+    ]
+
+
+def measure(servers: int, cards: str, achievements: str) -> tuple[int, int]:
+    """Load every server's universe, returning the bytes allocated and peak usage.
+
+    Each server decodes its own copy of the response, as it would in the bot.
+
+    Args:
+    ----
+    servers (int): The number of servers to load
+    cards (str): The card api response
+    achievements (str): The achievement api response
+    """
+    gc.collect()
+    tracemalloc.start()
+    universes = [
+        (parse_cards(loads(cards)), parse_achievements(loads(achievements))) for _ in range(servers)
+    ]
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del universes
+    return current, peak
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servers", type=int, default=8, help="number of servers to load")
+    parser.add_argument("--card-count", type=int, default=300, help="generated cards per server")
+    parser.add_argument("--cards", type=Path, help="a saved /cards api response")
+    parser.add_argument("--achievements", type=Path, help="a saved /achievements api response")
+    args = parser.parse_args()
+
+    cards = args.cards.read_text() if args.cards else dumps(fake_cards(args.card_count))
+    achievements = (
+        args.achievements.read_text() if args.achievements else dumps(fake_achievements(90))
+    )
+
+    current, peak = measure(args.servers, cards, achievements)
+    print(f"{args.servers} servers: {current / 1024:.0f} KiB retained, {peak / 1024:.0f} KiB peak")
+    print(f"{current / args.servers / 1024:.0f} KiB per server")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from pathlib import Path
 from time import time
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
 from interactions import Client, listen
 
 from bot.config import CONFIG
@@ -23,6 +24,14 @@ class Bot(Client):
         await server_manager.reload_all_generators()
 
         await bot.change_presence()
+        if CONFIG.REFRESH_MINUTES > 0:
+            # Ready fires again after reconnecting, which shouldn't add another copy of the job
+            scheduler.add_job(
+                server_manager.refresh_all,
+                IntervalTrigger(minutes=CONFIG.REFRESH_MINUTES),
+                id="refresh_all",
+                replace_existing=True,
+            )
         scheduler.start()
 
         print(f"Bot started in {round(time()-start, 2)}s")
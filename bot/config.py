@@ -19,5 +19,30 @@ class Config:
         self.SECRET: str = env.get("DISCORD_SECRET") or ""
         self.VERSION: str = env.get("VERSION") or ""
 
+        self.IMAGE_CACHE_BYTES: int = int(env.get("IMAGE_CACHE_BYTES") or 64 * 1024 * 1024)
+        self.IMAGE_STORAGE: str = env.get("IMAGE_STORAGE") or "decoded"
+        self.COMPRESSED_CACHE_BYTES: int = int(
+            env.get("COMPRESSED_CACHE_BYTES") or 32 * 1024 * 1024
+        )
+        self.TILE_CACHE_BYTES: int = int(env.get("TILE_CACHE_BYTES") or 64 * 1024 * 1024)
+        self.DECK_CACHE_BYTES: int = int(env.get("DECK_CACHE_BYTES") or 16 * 1024 * 1024)
+        self.IMAGE_CACHE_DIR: str = env.get("IMAGE_CACHE_DIR") or "persistent/image_cache"
+        self.SNAPSHOT_DIR: str = env.get("SNAPSHOT_DIR") or "persistent/snapshots"
+        self.ATLAS_DIR: str = env.get("ATLAS_DIR", "persistent/atlas")
+        self.RENDER_POOL: str = env.get("RENDER_POOL") or "thread"
+        self.RENDER_WORKERS: int = int(env.get("RENDER_WORKERS") or 2)
+        self.DECK_IMAGE_FORMAT: str = env.get("DECK_IMAGE_FORMAT") or "png"
+        self.DECK_IMAGE_LEVEL: int = int(env.get("DECK_IMAGE_LEVEL") or 6)
+        self.DECK_IMAGE_MAX_BYTES: int = int(env.get("DECK_IMAGE_MAX_BYTES") or 8 * 1024 * 1024)
+        self.CHART_IMAGE_FORMAT: str = env.get("CHART_IMAGE_FORMAT") or "png"
+        self.CHART_IMAGE_LEVEL: int = int(env.get("CHART_IMAGE_LEVEL") or 6)
+        self.CHART_IMAGE_MAX_BYTES: int = int(env.get("CHART_IMAGE_MAX_BYTES") or 8 * 1024 * 1024)
+        self.REFRESH_MINUTES: int = int(env.get("REFRESH_MINUTES") or 15)
+        self.PREFETCH_CONCURRENCY: int = int(env.get("PREFETCH_CONCURRENCY") or 8)
+        self.GRAPH_CACHE_BYTES: int = int(env.get("GRAPH_CACHE_BYTES") or 8 * 1024 * 1024)
+        self.GRAPH_PRECOMPUTE_HERMITS: int = int(env.get("GRAPH_PRECOMPUTE_HERMITS") or 0)
+        self.AUTOCOMPLETE_CACHE_SIZE: int = int(env.get("AUTOCOMPLETE_CACHE_SIZE") or 4096)
+        self.SERVER_LOAD_TIMEOUT: float = float(env.get("SERVER_LOAD_TIMEOUT") or 60)
+
 
 CONFIG = Config()
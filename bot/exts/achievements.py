@@ -2,10 +2,8 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
 from datetime import datetime as dt
 from datetime import timezone
-from itertools import islice
 from math import floor, log10
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -21,7 +19,7 @@ from interactions import (
     slash_option,
 )
 
-from bot.util import ServerManager, rgb_to_int
+from bot.util import ServerManager, normalize, rgb_to_int
 from bot.util.datagen import hex_to_int
 
 
@@ -68,11 +66,6 @@ def linear_interpolate(
     return rgb_to_int((rf, gf, bf))
 
 
-def take(items: int, iterable: Iterable) -> list:
-    """Return first `items` items of the iterable as a list."""
-    return list(islice(iterable, items))
-
-
 class AchievementExt(Extension):
     """Get information about cards and decks."""
 
@@ -96,20 +89,16 @@ class AchievementExt(Extension):
     async def achievement_autocomplete(self: AchievementExt, ctx: AutocompleteContext) -> None:
         """Autocomplete an achievement name."""
         server = self.manager.get_server(ctx.guild_id)
-        if not ctx.input_text:
-            await ctx.send(
-                [
-                    achievement.name
-                    for achievement in take(25, server.data_generator.achievement_universe)
-                ]
-            )
-            return
         await ctx.send(
-            [
-                card.name
-                for card in server.data_generator.achievement_universe
-                if ctx.input_text.lower() in card.name.lower()
-            ][0:25]
+            self.manager.autocomplete(
+                server,
+                "achievement",
+                ctx.input_text,
+                lambda text: [
+                    levels[0].name
+                    for levels in server.data_generator.achievement_index.search(text, 25)
+                ],
+            )
         )
 
     @slash_command()
@@ -125,20 +114,33 @@ class AchievementExt(Extension):
         autocomplete=True,
     )
     @slash_option("uuid", "Player uuid to get progress of", OptionType.STRING)
+    @slash_option("level", "The level of the achievement (default 1)", OptionType.INTEGER)
     async def info(
-        self: AchievementExt, ctx: SlashContext, achievement_name: str, uuid: str = ""
+        self: AchievementExt,
+        ctx: SlashContext,
+        achievement_name: str,
+        uuid: str = "",
+        level: int = 1,
     ) -> None:
         """Get information about cards and decks."""
         server = self.manager.get_server(ctx.guild_id)
         progress = None
-        achievements = [
-            achievement
-            for achievement in server.data_generator.achievement_universe
-            if achievement_name.lower() in achievement.name.lower()
-        ]
-        achievements.sort(key=lambda val: val.name)
-        if len(achievements) > 0:
-            achievement = achievements[0]
+        levels = server.data_generator.achievement_names.get(normalize(achievement_name))
+        if levels is None:
+            index = server.data_generator.achievement_index
+            matches = index.search(achievement_name, len(index), fuzzy=False)
+            matches.sort(key=lambda val: val[0].name)
+            if not matches:
+                matches = index.fuzzy_search(achievement_name, 1)
+            levels = matches[0] if matches else None
+        if levels is not None:
+            if level < 1 or level > len(levels):
+                await ctx.send(
+                    f"{levels[0].name} has {len(levels)} level{'' if len(levels) == 1 else 's'}",
+                    ephemeral=True,
+                )
+                return
+            achievement = levels[level - 1]
             if uuid != "":
                 progress = await server.get_player_achievement_progress(uuid, achievement)
                 if progress is None:
@@ -155,6 +157,8 @@ class AchievementExt(Extension):
                 e.add_field("Steps", str(achievement.steps), inline=True)
             else:
                 e.add_field("Progress", f"{progress}/{achievement.steps}")
+            if len(levels) > 1:
+                e.add_field("Level", f"{level}/{len(levels)}", inline=True)
 
             if global_percent is not None:
                 e.color = linear_interpolate(r=global_percent / 100)
@@ -4,14 +4,14 @@ from __future__ import annotations
 
 from asyncio import gather
 from collections import Counter
-from collections.abc import Iterable
 from datetime import datetime as dt
 from datetime import timezone
 from io import BytesIO
-from itertools import islice
 from math import ceil, sqrt
 from re import compile as re_compile
+from time import time
 
+import numpy as np
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from interactions import (
     AutocompleteContext,
@@ -26,31 +26,36 @@ from interactions import (
     SlashContext,
     component_callback,
     global_autocomplete,
+    listen,
     slash_command,
     slash_option,
     spread_to_rows,
 )
-from matplotlib import pyplot as plt
-from PIL import Image
+from matplotlib.figure import Figure
 
+from bot.config import CONFIG
 from bot.util import (
+    TILE_SIZE,
+    TRIALS,
     TYPE_COLORS,
     Card,
+    DeckRender,
     EffectCard,
+    EncodedImage,
     HermitCard,
     ItemCard,
     Server,
     ServerManager,
-    probability,
+    draw_chance,
+    normalize,
+    parse_categories,
+    probabilities,
+    render_atlas_deck,
+    render_deck,
     rgb_to_int,
+    simulate_attacks,
 )
 
-
-def take(items: int, iterable: Iterable) -> list:
-    """Return first `items` items of the iterable as a list."""
-    return list(islice(iterable, items))
-
-
 beige = (226, 202, 139)
 
 
@@ -68,6 +73,48 @@ def best_factors(number: int) -> tuple[int, int]:
     return ceil(x), ceil(x if number - x**2 == 0 else (number - x**2) / x + x)
 
 
+def hermit_chart(xs: list[int], ys: list[float], title: str) -> Figure:
+    """Draw the chance of having hermits in hand after each number of draws.
+
+    Args:
+    ----
+    xs (list): The numbers of draws
+    ys (list): The percentage chance after each number of draws
+    title (str): The chart title
+    """
+    figure = Figure()
+    axes = figure.subplots()
+    axes.plot(xs, ys)
+    axes.set_xlabel("Draws")
+    axes.set_ylabel("Probability")
+    axes.set_title(title)
+    axes.grid(visible=True)
+    return figure
+
+
+def attack_chart(names: list[str], chances: np.ndarray, turns: int) -> Figure:
+    """Draw the chance each hermit can use each attack by a turn.
+
+    Args:
+    ----
+    names (list): The hermit names
+    chances (ndarray): The percentage chance for each hermit's primary and secondary attack
+    turns (int): The turn the chances are for
+    """
+    figure = Figure(figsize=(max(6.4, len(names) * 0.8), 4.8))
+    axes = figure.subplots()
+    positions = np.arange(len(names))
+    axes.bar(positions - 0.2, chances[:, 0], 0.4, label="Primary")
+    axes.bar(positions + 0.2, chances[:, 1], 0.4, label="Secondary")
+    axes.set_xticks(positions, names, rotation=30, ha="right")
+    axes.set_ylabel("Probability")
+    axes.set_ylim(0, 100)
+    axes.set_title(f"Chance of being able to attack by turn {turns}")
+    axes.legend()
+    figure.tight_layout()
+    return figure
+
+
 class CardExt(Extension):
     """Get information about cards and decks."""
 
@@ -87,9 +134,50 @@ class CardExt(Extension):
         """
         self.manager: ServerManager = manager
 
+    @listen()
+    async def on_startup(self: CardExt) -> None:
+        """Render the common /card two_hermits graphs ahead of time."""
+        if CONFIG.GRAPH_PRECOMPUTE_HERMITS <= 0:
+            return
+        start = time()
+        await gather(
+            *(
+                self.hermit_graph(hermits, desired_hermits)
+                for desired_hermits in range(1, CONFIG.GRAPH_PRECOMPUTE_HERMITS + 1)
+                for hermits in range(1, 37)
+            )
+        )
+        print(f"Rendered hermit graphs in {round(time() - start, 2)}s")
+
+    async def hermit_graph(
+        self: CardExt, hermits: int, desired_hermits: int
+    ) -> tuple[EncodedImage, list[float]]:
+        """Get the graph of the chance to have hermits in hand, and the percentages it plots.
+
+        Args:
+        ----
+        hermits (int): The number of hermits in the deck
+        desired_hermits (int): The number of hermits wanted in hand
+        """
+        key = (hermits, desired_hermits)
+        cached = self.manager.graph_cache.get(key)
+        if cached is not None:
+            return cached
+
+        xs = list(range(35))
+        ys = (probabilities(hermits, desired_hermits)[: len(xs)] * 100).tolist()
+        graph = await self.manager.charts.render(
+            hermit_chart,
+            xs,
+            ys,
+            f"Chance of having {desired_hermits} hermits in your hand after x draws for {hermits} hermits",  # noqa: E501
+        )
+        self.manager.graph_cache.put(key, (graph, ys))
+        return graph, ys
+
     async def get_stats(
         self: CardExt, server: Server, deck: list[Card]
-    ) -> tuple[Image.Image, tuple[int, int, int], dict[str, int]]:
+    ) -> tuple[EncodedImage, tuple[int, int, int], dict[str, int]]:
         """Get information and an image of a deck.
 
         Args:
@@ -111,7 +199,7 @@ class CardExt(Extension):
         }
 
         if len(deck) == 0:
-            return Image.new("RGBA", (0, 0)), (0, 0, 0), type_counts
+            return EncodedImage(b"", "png"), (0, 0, 0), type_counts
 
         hermits, items, effects = ([] for _ in range(3))
         for card in deck:
@@ -129,34 +217,57 @@ class CardExt(Extension):
         effects.sort(key=lambda x: x.text_id)
 
         width, height = best_factors(len(deck))
-        im = Image.new("RGBA", (width * 200, height * 200))
 
+        atlas = server.data_generator.atlas
+        indices = (
+            atlas.indices(card.text_id for card in hermits + effects + items) if atlas else None
+        )
+        if atlas and indices is not None:
+            im = await self.manager.render_pool.run(
+                "deck render",
+                render_atlas_deck,
+                str(atlas.path),
+                len(atlas.index),
+                indices,
+                width,
+                height,
+                atlas.tile_size,
+                self.manager.deck_encoder,
+            )
+            return im, (len(hermits), len(effects), len(items)), type_counts
+
+        start = time()
         card_images = await gather(
             *(
-                server.data_generator.get_image(card.token_image_url)
+                server.data_generator.get_tile(card.token_image_url)
                 for card in hermits + effects + items
             )
         )
-        for i, card_image in enumerate(card_images):
-            card_image = card_image.resize((200, 200)).convert("RGBA")
-            im.paste(card_image, ((i % width) * 200, (i // width) * 200), card_image)
+        self.manager.render_pool.record("deck tiles", 0, time() - start)
+        im = await self.manager.render_pool.run(
+            "deck render",
+            render_deck,
+            card_images,
+            width,
+            height,
+            TILE_SIZE,
+            self.manager.deck_encoder,
+        )
         return im, (len(hermits), len(effects), len(items)), type_counts
 
     @global_autocomplete("card_name")
     async def card_autocomplete(self: CardExt, ctx: AutocompleteContext) -> None:
         """Autocomplete a card name."""
         server = self.manager.get_server(ctx.guild_id)
-        if not ctx.input_text:
-            await ctx.send(
-                [card.rarityName for card in take(25, server.data_generator.card_universe.values())]
-            )
-            return
         await ctx.send(
-            [
-                card.rarityName
-                for card in server.data_generator.card_universe.values()
-                if ctx.input_text.lower() in card.rarityName.lower()
-            ][0:25]
+            self.manager.autocomplete(
+                server,
+                "card",
+                ctx.input_text,
+                lambda text: [
+                    card.rarityName for card in server.data_generator.card_index.search(text, 25)
+                ],
+            )
         )
 
     @slash_command()
@@ -190,19 +301,29 @@ class CardExt(Extension):
         ).add_field("Deck loading", "Please wait")
         message = await ctx.send(embed=e)
 
-        im, card_type_counts, hermit_type_counts = await self.get_stats(
-            server,
-            [
-                server.data_generator.card_universe[card if type(card) is str else card["id"]]
-                for card in deck["cards"]
-            ],
+        cards = [
+            server.data_generator.card_universe[card if type(card) is str else card["id"]]
+            for card in deck["cards"]
+        ]
+        render_key = (
+            server.data_generator.universe_version,
+            tuple(sorted(card.text_id for card in cards)),
         )
+        render = server.data_generator.deck_cache.get(render_key)
+        if render is None:
+            render = DeckRender(*await self.get_stats(server, cards))
+            # Don't keep renders with missing card images
+            if all(server.data_generator.has_tile(card) for card in cards):
+                server.data_generator.deck_cache.put(render_key, render)
+        card_type_counts = render.card_type_counts
+        hermit_type_counts = render.hermit_type_counts
+
         if len(deck["tags"]) == 0:
             e.color = rgb_to_int(TYPE_COLORS[Counter(hermit_type_counts).most_common()[0][0]])
 
         e.fields.clear()
         e = (
-            e.set_image("attachment://deck.png")
+            e.set_image(f"attachment://{render.image.filename("deck")}")
             .add_field("Token cost", str(deck["cost"]), inline=True)
             .add_field(
                 "HEI ratio",
@@ -216,9 +337,7 @@ class CardExt(Extension):
             )
             .set_footer("Bot by Tyrannicodin16")
         )
-        with BytesIO() as im_binary:
-            im.save(im_binary, "PNG")
-            im_binary.seek(0)
+        with BytesIO(render.image.data) as im_binary:
             delete_button = Button(
                 style=ButtonStyle.DANGER,
                 label="Delete",
@@ -227,7 +346,7 @@ class CardExt(Extension):
             )
             await message.edit(
                 embed=e,
-                file=File(im_binary, "deck.png"),
+                file=File(im_binary, render.image.filename("deck")),
                 components=spread_to_rows(delete_button),
             )
 
@@ -251,12 +370,15 @@ class CardExt(Extension):
     async def info(self: CardExt, ctx: SlashContext, card_name: str) -> None:
         """Get information about a card."""
         server = self.manager.get_server(ctx.guild_id)
-        cards = [
-            card
-            for card in server.data_generator.card_universe.values()
-            if card_name.lower() in card.rarityName.lower()
-        ]
-        cards.sort(key=lambda val: val.rarityName)
+        exact = server.data_generator.card_names.get(normalize(card_name))
+        if exact is not None:
+            cards = [exact]
+        else:
+            index = server.data_generator.card_index
+            cards = index.search(card_name, len(index), fuzzy=False)
+            cards.sort(key=lambda val: val.rarityName)
+            if not cards:
+                cards = index.fuzzy_search(card_name, 1)
         if len(cards) > 0:
             card = cards[0]
             if isinstance(card, HermitCard):  # Special for hermits
@@ -315,6 +437,111 @@ class CardExt(Extension):
         else:
             await ctx.send("Couldn't find that card!", ephemeral=True)
 
+    @card.subcommand()
+    @slash_option(
+        "categories",
+        'Cards wanted, like "hermits=12:2, miner=8:1" for 2 of 12 hermits and 1 of 8 miner items',
+        OptionType.STRING,
+        required=True,
+    )
+    @slash_option(
+        "draws", "The most draws after the opening hand to show (default 5)", OptionType.INTEGER
+    )
+    @slash_option("deck_size", "The number of cards in the deck (default 42)", OptionType.INTEGER)
+    @slash_option(
+        "hand_size", "The number of cards in the opening hand (default 7)", OptionType.INTEGER
+    )
+    async def draw_odds(
+        self: CardExt,
+        ctx: SlashContext,
+        categories: str,
+        draws: int = 5,
+        deck_size: int = 42,
+        hand_size: int = 7,
+    ) -> None:
+        """View the chance of drawing at least some of each kind of card."""
+        if not 1 <= deck_size <= 100 or not 0 <= hand_size <= deck_size:
+            await ctx.send("Invalid deck size (1-100) or hand size", ephemeral=True)
+            return
+        try:
+            parsed = parse_categories(categories, deck_size)
+        except ValueError as error:
+            await ctx.send(str(error), ephemeral=True)
+            return
+        draws = max(0, min(draws, 20, deck_size - hand_size))
+
+        e = Embed(
+            title="Draw odds",
+            description="\n".join(
+                f"At least {category.minimum} of {category.count} {category.name}"
+                for category in parsed
+            ),
+            timestamp=dt.now(tz=timezone.utc),
+            color=rgb_to_int((178, 178, 255)),
+        ).add_field("Opening hand", f"{draw_chance(parsed, deck_size, hand_size):.1%}", inline=True)
+        for draw in range(1, draws + 1):
+            e.add_field(
+                f"After {draw} draw{'' if draw == 1 else 's'}",
+                f"{draw_chance(parsed, deck_size, hand_size + draw):.1%}",
+                inline=True,
+            )
+        e.set_footer("Bot by Tyrannicodin")
+        await ctx.send(embeds=e)
+
+    @card.subcommand()
+    @slash_option("code", "The deck's export code", OptionType.STRING, required=True)
+    @slash_option("turns", "The turn to find the chance by (default 5)", OptionType.INTEGER)
+    @slash_option(
+        "seed",
+        "Seed for the shuffles, to get the same result again",
+        OptionType.INTEGER,
+        min_value=0,
+    )
+    async def attack_odds(
+        self: CardExt, ctx: SlashContext, code: str, turns: int = 5, seed: int | None = None
+    ) -> None:
+        """View the chance each hermit in a deck has the items to attack by a turn."""
+        if turns < 1 or turns > 30:
+            await ctx.send("Invalid turn (1-30)", ephemeral=True)
+            return
+        server = self.manager.get_server(ctx.guild_id)
+        deck = await server.get_deck(code)
+        if not deck:
+            await ctx.send("Invalid deck: Perhaps you're looking for /card info", ephemeral=True)
+            return
+        if len(deck["cards"]) > 100:
+            await ctx.send(f"A deck of {len(deck["cards"])} cards is too large!", ephemeral=True)
+            return
+        cards = [
+            server.data_generator.card_universe[card if type(card) is str else card["id"]]
+            for card in deck["cards"]
+        ]
+        if not any(isinstance(card, HermitCard) for card in cards):
+            await ctx.send("That deck has no hermits!", ephemeral=True)
+            return
+
+        await ctx.defer()
+        readiness = await self.manager.render_pool.run(
+            "attack simulation", simulate_attacks, cards, turns, TRIALS, seed
+        )
+        graph = await self.manager.charts.render(
+            attack_chart,
+            [hermit.name for hermit in readiness.hermits],
+            readiness.chances[:, :, -1] * 100,
+            turns,
+        )
+
+        e = Embed(
+            title=f"{deck["name"]}: attacks by turn {turns}",
+            description=f"{TRIALS} shuffles" + ("" if seed is None else f", seed {seed}"),
+            timestamp=dt.now(tz=timezone.utc),
+            color=rgb_to_int((178, 178, 255)),
+        )
+        e.set_footer("Bot by Tyrannicodin")
+        e.set_image(f"attachment://{graph.filename("graph")}")
+        with BytesIO(graph.data) as figure_bytes:
+            await ctx.send(embeds=e, files=File(figure_bytes, graph.filename("graph")))
+
     @card.subcommand()
     @slash_option(
         "hermits",
@@ -339,17 +566,9 @@ class CardExt(Extension):
         if hermits < 1 or hermits > 36:
             await ctx.send("Invalid hermit count (1-36)", ephemeral=True)
             return
-        plt.figure()
-        xs = list(range(35))
-        ys = [probability(hermits, i, desired_hermits) * 100 for i in xs]
+        graph, ys = await self.hermit_graph(hermits, desired_hermits)
         surpass = next((idx[0] for idx in enumerate(ys) if idx[1] >= desired_chance), None)
-        plt.plot(xs, list(ys))
-        plt.xlabel("Draws")
-        plt.ylabel("Probability")
-        plt.title(
-            f"Chance of having {desired_hermits} hermits in your hand after x draws for {hermits} hermits"  # noqa: E501
-        )
-        plt.grid(visible=True)
+
         e = Embed(
             title=f"Chance of having {desired_hermits} hermits in your hand after x draws for {hermits} hermits",  # noqa: E501
             timestamp=dt.now(tz=timezone.utc),
@@ -360,12 +579,9 @@ class CardExt(Extension):
         else:
             e.add_field(f"Hits {desired_chance}%", "Never", inline=True)
         e.set_footer("Bot by Tyrannicodin | Probability calculations by Allophony")
-        e.set_image("attachment://graph.png")
-        with BytesIO() as figure_bytes:
-            plt.savefig(figure_bytes, format="png")
-            figure_bytes.seek(0)
-            await ctx.send(embeds=e, files=File(figure_bytes, "graph.png"))
-        plt.close()
+        e.set_image(f"attachment://{graph.filename("graph")}")
+        with BytesIO(graph.data) as figure_bytes:
+            await ctx.send(embeds=e, files=File(figure_bytes, graph.filename("graph")))
 
     @card.subcommand()
     async def chart(self: CardExt, ctx: SlashContext) -> None:
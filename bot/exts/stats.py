@@ -17,9 +17,9 @@ from interactions import (
     slash_command,
     slash_option,
 )
-from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.offsetbox import AnnotationBbox, OffsetImage
-from numpy import ndarray
+from numpy import asarray, ndarray
 from PIL import Image, ImageDraw
 
 from bot.util import TYPE_COLORS, Server, ServerManager, rgb_to_int
@@ -56,6 +56,46 @@ def reduce_rgb(color: tuple[int, int, int]) -> tuple[float, float, float]:
     return (r, g, b)
 
 
+def type_chart(
+    ys: list[float],
+    colors: list[tuple[float, float, float]],
+    icons: list[list[ndarray]],
+    label: str,
+) -> Figure:
+    """Draw a bar for each type combination, with the type icons under each bar.
+
+    Args:
+    ----
+    ys (list): The height of each bar
+    colors (list): The color of each bar
+    icons (list): The icons to show under each bar
+    label (str): The y axis label
+    """
+    figure = Figure()
+    axes = figure.subplots()
+    axes.bar(list(range(len(ys))), ys, color=colors)
+
+    for i, bar_icons in enumerate(icons):
+        y_offset = 0
+        for icon in bar_icons:
+            ab = AnnotationBbox(
+                OffsetImage(icon),
+                (i, 0),
+                xybox=(0, -8 + y_offset),
+                frameon=False,
+                xycoords="data",
+                boxcoords="offset points",
+                pad=0,
+            )
+            y_offset -= 15
+            axes.add_artist(ab)
+
+    axes.get_xaxis().set_ticks([])
+    axes.set_ylabel(label)
+    axes.grid(visible=True, axis="y")
+    return figure
+
+
 class StatsFailureError(Exception):
     """Failure in generating stats."""
 
@@ -82,6 +122,7 @@ class StatsExt(Extension):
 
         self.icons: dict[str, ndarray] | None = None
         self.small_icons: dict[str, ndarray] | None = None
+        self.icon_source: dict[str, Image.Image] | None = None
 
     @slash_command()
     async def stats(self: StatsExt, _ctx: SlashContext) -> None:
@@ -216,58 +257,34 @@ class StatsExt(Extension):
     ) -> tuple[BytesIO, File, Embed]:
         """Generate a bar chart of either win rate or usage by type."""
         stats: list[dict] = (await server.get_type_distribution_stats())["types"]
-        if self.icons is None or self.small_icons is None:
-            self.icons = {}
-            self.small_icons = {}
-            icons = await server.get_type_icons()
+        icons = await server.get_type_icons()
+        # Rebuild the icons when the server's type icons are reloaded
+        if icons is not self.icon_source or self.icons is None or self.small_icons is None:
             if not icons:
                 err = "Couldn't find type images"
                 raise StatsFailureError(err)
+            self.icons = {}
+            self.small_icons = {}
+            self.icon_source = icons
             for hermit_type, pil_icon in icons.items():
-                with BytesIO() as image_bytes:
-                    pil_icon.resize((25, 25), Image.Resampling.BILINEAR).save(image_bytes, "png")
-                    image_bytes.seek(0)
-                    img = plt.imread(image_bytes)
-                    self.icons[hermit_type] = img
-                with BytesIO() as image_bytes:
-                    pil_icon.resize((12, 12), Image.Resampling.BILINEAR).save(image_bytes, "png")
-                    image_bytes.seek(0)
-                    img = plt.imread(image_bytes)
-                    self.small_icons[hermit_type] = img
+                icon = pil_icon.convert("RGBA")
+                self.icons[hermit_type] = asarray(icon.resize((25, 25), Image.Resampling.BILINEAR))
+                self.small_icons[hermit_type] = asarray(
+                    icon.resize((12, 12), Image.Resampling.BILINEAR)
+                )
 
         if stats is None or self.icons is None or self.small_icons is None:
             err = "Couldn't find stats or type images"
             raise StatsFailureError(err)
 
         stats.sort(key=lambda stat: stat[key], reverse=True)
-        plt.figure()
-        xs = list(range(len(stats)))
-        ys = [float(stat[key] * 100) for stat in stats]
-        colors = [reduce_rgb(get_type_color(stat["type"])) for stat in stats]
-
-        plt.bar(xs, ys, color=colors)
-
-        gc = plt.gca()
-
-        for i, types in enumerate(stat["type"] for stat in stats):
-            y_offset = 0
-            for hermit_type in types:
-                ab = AnnotationBbox(
-                    OffsetImage(self.small_icons[hermit_type]),
-                    (i, 0),
-                    xybox=(0, -8 + y_offset),
-                    frameon=False,
-                    xycoords="data",
-                    boxcoords="offset points",
-                    pad=0,
-                )
-                y_offset -= 15
-                gc.add_artist(ab)
-
-        if gc.axes is not None:
-            gc.axes.get_xaxis().set_ticks([])
-        gc.set_ylabel(f"{name} (%)")
-        plt.grid(visible=True, axis="y")
+        graph = await self.manager.charts.render(
+            type_chart,
+            [float(stat[key] * 100) for stat in stats],
+            [reduce_rgb(get_type_color(stat["type"])) for stat in stats],
+            [[self.small_icons[hermit_type] for hermit_type in stat["type"]] for stat in stats],
+            f"{name} (%)",
+        )
 
         embed = (
             Embed(
@@ -277,14 +294,11 @@ class StatsExt(Extension):
                 timestamp=datetime.now(tz=timezone.utc),
             )
             .set_footer("Bot by Tyrannicodin")
-            .set_image("attachment://graph.png")
+            .set_image(f"attachment://{graph.filename("graph")}")
         )
 
-        figure_bytes = BytesIO()
-        plt.savefig(figure_bytes, format="PNG")
-        plt.close()
-        figure_bytes.seek(0)
-        return figure_bytes, File(figure_bytes, "graph.png"), embed
+        figure_bytes = BytesIO(graph.data)
+        return figure_bytes, File(figure_bytes, graph.filename("graph")), embed
 
     @stats.subcommand()
     async def games(self: StatsExt, ctx: SlashContext) -> None:
@@ -6,7 +6,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from interactions import Client, Extension, SlashContext, Status, User, slash_command
 
 from bot.config import CONFIG
-from bot.util import DataGenerator, ServerManager
+from bot.util import DataGenerator, LruCache, ServerManager
 
 
 class UtilExt(Extension):
@@ -15,7 +15,7 @@ class UtilExt(Extension):
     def __init__(
         self: UtilExt,
         client: Client,
-        _manager: ServerManager,
+        manager: ServerManager,
         _scheduler: AsyncIOScheduler,
     ) -> None:
         """Commands for the bot.
@@ -23,11 +23,12 @@ class UtilExt(Extension):
         Args:
         ----
         client (Client): The discord bot client
-        _manager (ServerManager): The server connection manager
+        manager (ServerManager): The server connection manager
         _scheduler (AsyncIOScheduler): Event scheduler
         _generator (DataGenerator): Card data generator
         """
         self.client: Client = client
+        self.manager: ServerManager = manager
 
     @slash_command()
     async def util(self: UtilExt, _: SlashContext) -> None:
@@ -41,6 +42,66 @@ class UtilExt(Extension):
             ephemeral=True,
         )
 
+    @util.subcommand()
+    async def cache(self: UtilExt, ctx: SlashContext) -> None:
+        """Get cache usage for this server."""
+        if ctx.member is None:
+            await ctx.send("You can't do that!", ephemeral=True)
+            return
+        server = self.manager.get_server(ctx.guild_id)
+        if not server.authorize_user(ctx.member):
+            await ctx.send("You can't do that!", ephemeral=True)
+            return
+
+        caches: dict[str, LruCache] = {
+            "Images": server.data_generator.cache,
+            "Deck tiles": server.data_generator.tile_cache,
+            "Deck renders": server.data_generator.deck_cache,
+        }
+        if server.data_generator.compressed_cache is not None:
+            caches["Compressed images"] = server.data_generator.compressed_cache
+        caches["Hermit graphs (all servers)"] = self.manager.graph_cache
+        autocomplete = self.manager.autocomplete_cache
+        await ctx.send(
+            "\n".join(
+                f"{name}: {len(cache)} cached, "
+                + f"{cache.size / 2**20:.1f}/{cache.max_size / 2**20:.1f}MiB, "
+                + f"{cache.hits} hits, {cache.misses} misses ({cache.hit_rate:.1%}), "
+                + f"{cache.evictions} evictions"
+                for name, cache in caches.items()
+            )
+            + f"\nAutocomplete (all servers): {len(autocomplete)}/{autocomplete.max_size} cached, "
+            + f"{autocomplete.hits} hits, {autocomplete.misses} misses "
+            + f"({autocomplete.hit_rate:.1%}), {autocomplete.evictions} evictions",
+            ephemeral=True,
+        )
+
+    @util.subcommand()
+    async def timings(self: UtilExt, ctx: SlashContext) -> None:
+        """Get how long loading and image rendering are taking."""
+        if ctx.member is None:
+            await ctx.send("You can't do that!", ephemeral=True)
+            return
+        server = self.manager.get_server(ctx.guild_id)
+        if not server.authorize_user(ctx.member):
+            await ctx.send("You can't do that!", ephemeral=True)
+            return
+
+        lines = []
+        if server.server_id in self.manager.load_times:
+            lines.append(f"Last load: {self.manager.load_times[server.server_id]:.2f}s")
+        lines.extend(
+            f"{stage}: {timing.count} runs, "
+            + f"{timing.queued / timing.count * 1000:.1f}ms queued, "
+            + f"{timing.working / timing.count * 1000:.1f}ms working on average "
+            + f"(last {timing.last_queued * 1000:.1f}ms, {timing.last_working * 1000:.1f}ms)"
+            for stage, timing in self.manager.render_pool.timings.items()
+        )
+        if not lines:
+            await ctx.send("Nothing has been loaded or rendered yet", ephemeral=True)
+            return
+        await ctx.send("\n".join(lines), ephemeral=True)
+
     @util.subcommand()
     async def stop(self: UtilExt, ctx: SlashContext) -> None:
         """Gracefully shutdown the bot."""
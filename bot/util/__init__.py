@@ -1,5 +1,10 @@
 """Utility function for the bot to use."""
 
+from .atlas import *
+from .cache import *
 from .datagen import *
 from .probability import *
+from .render import *
+from .search import *
 from .server import *
+from .simulate import *
@@ -0,0 +1,107 @@
+"""Store every card's deck tile in one memory mapped file."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from functools import lru_cache
+from os import replace
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from bot.util.render import EncodedImage, ImageEncoder
+
+# Atlas mappings reused by renders in each process. Atlases in use keep their own mapping,
+# so replaced atlases are let go once they fall out of this
+ATLAS_MAPPINGS = 16
+
+
+@lru_cache(ATLAS_MAPPINGS)
+def _open_tiles(path: str, count: int, tile_size: int) -> np.memmap:
+    """Map an atlas file into memory, reusing recent mappings within a process."""
+    return np.memmap(path, np.uint8, "r", shape=(count, tile_size, tile_size, 4))
+
+
+def render_atlas_deck(
+    path: str,
+    count: int,
+    indices: list[int],
+    width: int,
+    height: int,
+    tile_size: int,
+    encoder: ImageEncoder,
+) -> EncodedImage:
+    """Arrange atlas tiles in a grid and encode the result.
+
+    Args:
+    ----
+    path (str): The atlas file
+    count (int): The number of tiles in the atlas
+    indices (list): The atlas index of each tile, in the order they should appear
+    width (int): The number of tiles in each row
+    height (int): The number of rows
+    tile_size (int): The width and height of each tile
+    encoder (ImageEncoder): How to encode the image
+    """
+    tiles = np.zeros((width * height, tile_size, tile_size, 4), np.uint8)
+    tiles[: len(indices)] = _open_tiles(path, count, tile_size)[indices]
+    mosaic = (
+        tiles.reshape(height, width, tile_size, tile_size, 4)
+        .transpose(0, 2, 1, 3, 4)
+        .reshape(height * tile_size, width * tile_size, 4)
+    )
+    return encoder.encode(Image.fromarray(mosaic, "RGBA"))
+
+
+class CardAtlas:
+    """Every card's deck tile, stored in one memory mapped file."""
+
+    def __init__(self: CardAtlas, path: Path, card_ids: list[str], tile_size: int) -> None:
+        """Open an atlas file.
+
+        Args:
+        ----
+        path (Path): The atlas file
+        card_ids (list): The card ids in the order their tiles were written
+        tile_size (int): The width and height of each tile
+        """
+        self.path: Path = path
+        self.tile_size: int = tile_size
+        self.index: dict[str, int] = {card_id: i for i, card_id in enumerate(card_ids)}
+        self.tiles: np.memmap = _open_tiles(str(path), len(card_ids), tile_size)
+
+    @staticmethod
+    def write(path: Path, tiles: list[Image.Image], tile_size: int) -> None:
+        """Write tiles to an atlas file.
+
+        Tiles are stored as they look once pasted onto a transparent deck image.
+
+        Args:
+        ----
+        path (Path): The file to write
+        tiles (list): The tiles in card id order
+        tile_size (int): The width and height of each tile
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        atlas = np.memmap(temp_path, np.uint8, "w+", shape=(len(tiles), tile_size, tile_size, 4))
+        for i, tile in enumerate(tiles):
+            background = Image.new("RGBA", (tile_size, tile_size))
+            background.paste(tile, (0, 0), tile)
+            atlas[i] = np.asarray(background)
+        atlas.flush()
+        del atlas
+        replace(temp_path, path)
+
+    def indices(self: CardAtlas, card_ids: Iterable[str]) -> list[int] | None:
+        """Get the atlas index of each card, or None if any are missing.
+
+        Args:
+        ----
+        card_ids (Iterable): The ids of the cards
+        """
+        try:
+            return [self.index[card_id] for card_id in card_ids]
+        except KeyError:
+            return None
@@ -0,0 +1,206 @@
+"""Memory bounded caches."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from hashlib import sha256
+from json import JSONDecodeError, dump, load
+from os import replace
+from pathlib import Path
+from typing import Generic, TypeVar
+
+from PIL import Image
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def image_size(image: Image.Image) -> int:
+    """Get the number of bytes an image takes up once decoded.
+
+    Args:
+    ----
+    image (Image): The image to measure
+    """
+    return image.width * image.height * len(image.getbands())
+
+
+class LruCache(Generic[K, V]):
+    """A least recently used cache with a size budget."""
+
+    def __init__(
+        self: LruCache[K, V], max_size: int, sizeof: Callable[[V], int] | None = None
+    ) -> None:
+        """Create a cache that evicts the least recently used items once it is full.
+
+        Args:
+        ----
+        max_size (int): The total size the cache can hold
+        sizeof (Callable): Get the size of an item, each item has a size of 1 if not given
+        """
+        self.max_size: int = max_size
+        self.sizeof: Callable[[V], int] = sizeof or (lambda _: 1)
+        self.size: int = 0
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        self._items: OrderedDict[K, tuple[V, int]] = OrderedDict()
+
+    def __len__(self: LruCache[K, V]) -> int:
+        """Get the number of items in the cache."""
+        return len(self._items)
+
+    def __contains__(self: LruCache[K, V], key: K) -> bool:
+        """Check if an item is cached, without counting as a use."""
+        return key in self._items
+
+    @property
+    def hit_rate(self: LruCache[K, V]) -> float:
+        """Get the fraction of lookups that were found in the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def get(self: LruCache[K, V], key: K) -> V | None:
+        """Get an item from the cache, marking it as recently used.
+
+        Args:
+        ----
+        key (Hashable): The key of the item
+        """
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self: LruCache[K, V], key: K, value: V) -> None:
+        """Add an item to the cache, evicting old items if there isn't room.
+
+        Items larger than the whole budget are not stored.
+
+        Args:
+        ----
+        key (Hashable): The key of the item
+        value (Any): The item to store
+        """
+        self.pop(key)
+        item_size = self.sizeof(value)
+        if item_size > self.max_size:
+            return
+        while self._items and self.size + item_size > self.max_size:
+            _, (_, evicted_size) = self._items.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+        self._items[key] = (value, item_size)
+        self.size += item_size
+
+    def pop(self: LruCache[K, V], key: K) -> V | None:
+        """Remove an item from the cache.
+
+        Args:
+        ----
+        key (Hashable): The key of the item
+        """
+        item = self._items.pop(key, None)
+        if item is None:
+            return None
+        self.size -= item[1]
+        return item[0]
+
+    def clear(self: LruCache[K, V]) -> None:
+        """Remove all items from the cache."""
+        self._items.clear()
+        self.size = 0
+
+
+class DiskCache:
+    """Keep downloaded files on disk so they survive restarts."""
+
+    def __init__(self: DiskCache, directory: Path) -> None:
+        """Keep downloaded files on disk so they survive restarts.
+
+        Args:
+        ----
+        directory (Path): The folder to store files in
+        """
+        self.directory: Path = directory
+
+    def _paths(self: DiskCache, key: str) -> tuple[Path, Path]:
+        """Get the content and metadata file locations for a key."""
+        name = sha256(key.encode()).hexdigest()
+        return self.directory / f"{name}.bin", self.directory / f"{name}.json"
+
+    def read(self: DiskCache, key: str) -> tuple[bytes, dict[str, str]] | None:
+        """Get the stored content and validation headers for a key.
+
+        Args:
+        ----
+        key (str): The key the file was stored under
+        """
+        content_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta: dict[str, str] = load(f)
+            content = content_path.read_bytes()
+        except (OSError, JSONDecodeError):
+            return None
+        return content, meta
+
+    def read_meta(self: DiskCache, key: str) -> dict[str, str] | None:
+        """Get the stored validation headers for a key without reading the content.
+
+        Args:
+        ----
+        key (str): The key the file was stored under
+        """
+        try:
+            with open(self._paths(key)[1]) as f:
+                return load(f)
+        except (OSError, JSONDecodeError):
+            return None
+
+    def write(self: DiskCache, key: str, content: bytes, headers: Mapping[str, str]) -> None:
+        """Store content along with the headers needed to revalidate it.
+
+        Args:
+        ----
+        key (str): The key to store the file under
+        content (bytes): The file content
+        headers (Mapping): The response headers, only ETag and Last-Modified are kept
+        """
+        content_path, meta_path = self._paths(key)
+        meta = {"key": key} | {
+            header: headers[header] for header in ("ETag", "Last-Modified") if header in headers
+        }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Entries are only read with their metadata, which is written last,
+            # so a crash never leaves content paired with the wrong validators
+            meta_path.unlink(missing_ok=True)
+            temp_path = content_path.with_suffix(".tmp")
+            temp_path.write_bytes(content)
+            replace(temp_path, content_path)
+            with open(meta_path, "w") as f:
+                dump(meta, f)
+        except OSError:
+            return
+
+    def remove(self: DiskCache, key: str) -> None:
+        """Remove a stored file.
+
+        Args:
+        ----
+        key (str): The key the file was stored under
+        """
+        content_path, meta_path = self._paths(key)
+        # Remove the metadata first so the content is never read without it
+        for path in (meta_path, content_path):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                return
@@ -2,14 +2,27 @@
 
 from __future__ import annotations
 
+from asyncio import Lock, Semaphore, Task, create_task, gather, shield, to_thread
+from collections.abc import Iterable
+from contextlib import suppress
+from gzip import compress, decompress
+from hashlib import sha256
 from io import BytesIO
-from json import loads
+from json import JSONDecodeError, dumps, loads
+from pathlib import Path
 from ssl import SSLContext
+from sys import intern
+from time import time
 from typing import Any
 
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession
 from PIL import Image
 
+from bot.util.atlas import CardAtlas
+from bot.util.cache import DiskCache, LruCache, image_size
+from bot.util.render import EncodedImage
+from bot.util.search import SearchIndex, normalize
+
 try:
     has_progression = True
     from tqdm import tqdm
@@ -31,6 +44,10 @@ TYPE_COLORS = {
     "any": (0, 0, 0),
 }
 
+TILE_SIZE = 200
+# Api endpoints kept in snapshots so the bot can start without the server
+SNAPSHOT_ENDPOINTS = ("cards", "achievements")
+
 
 def rgb_to_int(rgb: tuple[int, int, int]) -> int:
     """Convert an rgb tuple to an integer.
@@ -52,9 +69,25 @@ def hex_to_int(hex_str: str) -> int:
     return int(hex_str.lstrip("#"), 16)
 
 
+def _intern(value: str | None) -> str | None:
+    """Share one copy of a string between every server that uses it."""
+    return None if value is None else intern(value)
+
+
 class Card:
     """Card data."""
 
+    __slots__ = (
+        "category",
+        "cost",
+        "image_url",
+        "name",
+        "rarity",
+        "rarityName",
+        "text_id",
+        "token_image_url",
+    )
+
     def __init__(self: Card, data: dict) -> None:
         """Init card.
 
@@ -62,25 +95,43 @@ class Card:
         ----
         data (dict): card informtaion
         """
-        self._raw_data: dict = data
-
-        self.text_id: str = data["id"]
-        self.category: str = data["category"]
+        self.text_id: str = intern(data["id"])
+        self.category: str = intern(data["category"])
 
         self.cost: int = data["tokens"]
-        self.image_url: str = data["images"]["default"]
-        self.token_image_url: str = data["images"]["with-token-cost"]
+        self.image_url: str = intern(data["images"]["default"])
+        self.token_image_url: str = intern(data["images"]["with-token-cost"])
 
-        self.rarity: str = (
+        self.rarity: str = intern(
             "Ultra rare" if data["rarity"] == "ultra_rare" else data["rarity"].capitalize()
         )
-        self.name: str = data["name"]
-        self.rarityName: str = f"{data['name']} ({self.rarity})"
+        self.name: str = intern(data["name"])
+        self.rarityName: str = intern(f"{data['name']} ({self.rarity})")
+
+    def _values(self: Card) -> tuple[Any, ...]:
+        """Get every field of the card, used to tell if a card has changed."""
+        return tuple(
+            getattr(self, field)
+            for cls in type(self).__mro__
+            for field in getattr(cls, "__slots__", ())
+        )
+
+    def __eq__(self: Card, other: object) -> bool:
+        """Check if two cards have the same type and data."""
+        if not isinstance(other, Card):
+            return NotImplemented
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __hash__(self: Card) -> int:
+        """Hash a card by its id."""
+        return hash(self.text_id)
 
 
 class HermitCard(Card):
     """Hermit card data."""
 
+    __slots__ = ("attacks", "health", "hermit_type")
+
     def __init__(self: HermitCard, data: dict) -> None:
         """Init card.
 
@@ -91,7 +142,7 @@ class HermitCard(Card):
         """
         super().__init__(data)
 
-        self.hermit_type: str = data["type"]
+        self.hermit_type: str = intern(data["type"])
         self.health: int = data["health"]
         self.attacks: list[dict[str, Any]] = [data["primary"], data["secondary"]]
 
@@ -99,6 +150,8 @@ class HermitCard(Card):
 class EffectCard(Card):
     """Effect card data."""
 
+    __slots__ = ("description",)
+
     def __init__(self: EffectCard, data: dict) -> None:
         """Init card.
 
@@ -109,12 +162,14 @@ class EffectCard(Card):
         """
         super().__init__(data)
 
-        self.description = data["description"]
+        self.description: str = intern(data["description"])
 
 
 class ItemCard(Card):
     """Item card data."""
 
+    __slots__ = ("energy",)
+
     def __init__(self: ItemCard, data: dict) -> None:
         """Init card.
 
@@ -123,7 +178,7 @@ class ItemCard(Card):
         data (dict): card informtaion
         generator (dict): generator this card is part of
         """
-        self.energy: list[str] = data["energy"]
+        self.energy: list[str] = [intern(energy) for energy in data["energy"]]
 
         super().__init__(data)
 
@@ -131,6 +186,17 @@ class ItemCard(Card):
 class Achievement:
     """Achievement data."""
 
+    __slots__ = (
+        "achievement_id",
+        "border_color",
+        "description",
+        "image_url",
+        "index",
+        "max_level",
+        "name",
+        "steps",
+    )
+
     def __init__(self: Achievement, data: dict) -> None:
         """Init achievement.
 
@@ -139,11 +205,9 @@ class Achievement:
         data (dict): achievement informtaion
         generator (dict): generator this achievement is part of
         """
-        self._raw_data: dict = data
-
-        self.achievement_id: str = data["achievementId"]
-        self.name: str = data["name"]
-        self.description: str = data["description"]
+        self.achievement_id: str = intern(data["achievementId"])
+        self.name: str = intern(data["name"])
+        self.description: str = intern(data["description"])
         self.steps: int = data["steps"]
 
         self.index: int = data["index"]
@@ -151,10 +215,155 @@ class Achievement:
         self.image_url: str | None = None
         self.border_color: str | None = None
         if data["preview"]:
-            self.image_url = data["preview"]["image"]
-            self.border_color = (
-                data["preview"]["borderColor"] if "borderColor" in data["preview"].keys() else None
-            )
+            self.image_url = _intern(data["preview"]["image"])
+            self.border_color = _intern(data["preview"].get("borderColor"))
+
+    def _values(self: Achievement) -> tuple[Any, ...]:
+        """Get every field of the achievement, used to tell if it has changed."""
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __eq__(self: Achievement, other: object) -> bool:
+        """Check if two achievements have the same data."""
+        if not isinstance(other, Achievement):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self: Achievement) -> int:
+        """Hash an achievement by its id and level."""
+        return hash((self.achievement_id, self.index))
+
+
+def make_tile(image: Image.Image, size: int = TILE_SIZE) -> Image.Image:
+    """Scale an image to a square RGBA tile.
+
+    Images much larger than the tile are reduced by an integer factor before resampling.
+
+    Args:
+    ----
+    image (Image): The image to scale
+    size (int): The width and height of the tile
+    """
+    return image.resize((size, size), reducing_gap=2.0).convert("RGBA")
+
+
+def decode_image(content: bytes) -> Image.Image | None:
+    """Decode an image, returning None if it isn't a valid image.
+
+    Args:
+    ----
+    content (bytes): The encoded image
+    """
+    # Closing the buffer once the pixels are loaded stops the image keeping a second copy
+    with BytesIO(content) as buffer:
+        try:
+            image = Image.open(buffer)
+            image.load()
+        except (Image.UnidentifiedImageError, OSError):
+            return None
+    return image
+
+
+class DeckRender:
+    """A rendered deck image and its stats."""
+
+    def __init__(
+        self: DeckRender,
+        image: EncodedImage,
+        card_type_counts: tuple[int, int, int],
+        hermit_type_counts: dict[str, int],
+    ) -> None:
+        """Store a rendered deck image and its stats.
+
+        Args:
+        ----
+        image (EncodedImage): The encoded deck image
+        card_type_counts (tuple): The number of hermit, effect and item cards
+        hermit_type_counts (dict): The number of hermits of each type
+        """
+        self.image: EncodedImage = image
+        self.card_type_counts: tuple[int, int, int] = card_type_counts
+        self.hermit_type_counts: dict[str, int] = hermit_type_counts
+
+
+class EndpointResponse:
+    """A changed api response."""
+
+    def __init__(
+        self: EndpointResponse,
+        content: bytes,
+        validators: dict[str, str],
+        data: list[dict[str, Any]],
+    ) -> None:
+        """Store a changed api response.
+
+        Args:
+        ----
+        content (bytes): The response body
+        validators (dict): The response's ETag and Last-Modified headers
+        data (list): The decoded json
+        """
+        self.content: bytes = content
+        self.content_hash: str = sha256(content).hexdigest()
+        self.validators: dict[str, str] = validators
+        self.data: list[dict[str, Any]] = data
+
+
+def parse_cards(data: Iterable[dict[str, Any]]) -> list[Card]:
+    """Create cards from api data.
+
+    Args:
+    ----
+    data (Iterable): The card data from the api
+    """
+    if has_progression:
+        data = tqdm(data, "Loading cards")
+    return [get_card(card) for card in data]
+
+
+def parse_achievements(data: Iterable[dict[str, Any]]) -> list[Achievement]:
+    """Create achievements from api data.
+
+    Args:
+    ----
+    data (Iterable): The achievement data from the api
+    """
+    if has_progression:
+        data = tqdm(data, "Loading achievements")
+    return [Achievement(achievement) for achievement in data]
+
+
+def card_names(cards: Iterable[Card]) -> dict[str, Card]:
+    """Map the normalized rarity name, id and name of each card to the card.
+
+    Rarity names take priority over ids, which take priority over names. A name shared
+    by several rarities maps to the first by rarity name.
+
+    Args:
+    ----
+    cards (Iterable): The cards to map
+    """
+    cards = sorted(cards, key=lambda card: card.rarityName)
+    names: dict[str, Card] = {}
+    for card in cards:
+        names.setdefault(normalize(card.name), card)
+    names.update((normalize(card.text_id), card) for card in cards)
+    names.update((normalize(card.rarityName), card) for card in cards)
+    return names
+
+
+def group_achievements(achievements: Iterable[Achievement]) -> dict[str, list[Achievement]]:
+    """Group the levels of each achievement by id, lowest level first.
+
+    Args:
+    ----
+    achievements (Iterable): Every level of every achievement
+    """
+    levels: dict[str, list[Achievement]] = {}
+    for achievement in achievements:
+        levels.setdefault(achievement.achievement_id, []).append(achievement)
+    for achievement_levels in levels.values():
+        achievement_levels.sort(key=lambda achievement: achievement.index)
+    return levels
 
 
 def get_card(data: dict) -> Card:
@@ -172,22 +381,410 @@ def get_card(data: dict) -> Card:
 class DataGenerator:
     """Generate card images for hc-tcg."""
 
-    def __init__(self: DataGenerator, session: ClientSession) -> None:
-        """Init generator."""
+    def __init__(
+        self: DataGenerator,
+        session: ClientSession,
+        cache_bytes: int,
+        tile_cache_bytes: int,
+        deck_cache_bytes: int,
+        disk_cache: DiskCache | None = None,
+        atlas_directory: Path | None = None,
+        snapshot_cache: DiskCache | None = None,
+        compressed_cache_bytes: int | None = None,
+    ) -> None:
+        """Init generator.
+
+        Args:
+        ----
+        session (ClientSession): Session connected to the hc-tcg server api
+        cache_bytes (int): Decoded size in bytes of the images to keep in memory
+        tile_cache_bytes (int): Size in bytes of the scaled deck tiles to keep in memory
+        deck_cache_bytes (int): Size in bytes of the rendered deck images to keep in memory
+        disk_cache (DiskCache): Where to keep downloaded images between restarts
+        atlas_directory (Path): Where to keep card atlases, no atlas is built if not given
+        snapshot_cache (DiskCache): Where to keep the last card and achievement data
+        compressed_cache_bytes (int): Size in bytes of the encoded images to keep in memory,
+        if given only the most recently used images are kept decoded, limited by cache_bytes
+        """
         self.http_session = session
 
         self.exclude: list[int] = []
-
-    async def reload_all(self: DataGenerator) -> None:
-        """Reload all card information."""
-        self.cache: dict[str, Image.Image] = {}
+        self.cache: LruCache[str, Image.Image] = LruCache(cache_bytes, image_size)
+        self.compressed_cache: LruCache[str, bytes] | None = (
+            None if compressed_cache_bytes is None else LruCache(compressed_cache_bytes, len)
+        )
+        self.tile_cache: LruCache[str, Image.Image] = LruCache(tile_cache_bytes, image_size)
+        self.deck_cache: LruCache[tuple[int, tuple[str, ...]], DeckRender] = LruCache(
+            deck_cache_bytes, lambda render: len(render.image.data)
+        )
         self.card_universe: dict[str, Card] = {}
+        self.card_index: SearchIndex[Card] = SearchIndex([])
+        self.card_names: dict[str, Card] = {}
         self.achievement_universe: list[Achievement] = []
+        self.achievement_levels: dict[str, list[Achievement]] = {}
+        self.achievement_names: dict[str, list[Achievement]] = {}
+        self.achievement_index: SearchIndex[list[Achievement]] = SearchIndex([])
+        self.universe_version: int = 0
+        self.disk_cache: DiskCache | None = disk_cache
+        self.atlas_directory: Path | None = atlas_directory
+        self.atlas: CardAtlas | None = None
+        self.snapshot_cache: DiskCache | None = snapshot_cache
+        self._pending_images: dict[str, Task[Image.Image]] = {}
+        self._pending_tiles: dict[str, Task[Image.Image]] = {}
+        self._revalidated: set[str] = set()
+        self._background_tasks: set[Task[None]] = set()
+        self._warmup_lock: Lock = Lock()
+        self._endpoint_validators: dict[str, dict[str, str]] = {}
+        self._endpoint_hashes: dict[str, str] = {}
+
+    async def reload_all(self: DataGenerator) -> bool:
+        """Reload all card information, returning True if anything changed.
+
+        Data that fails to load or hasn't changed on the server is left as it was, and data
+        that fails to load is requested in full next time.
+        """
+        results = await gather(self.load_cards(), self.load_achievements(), return_exceptions=True)
+        loaded: list[tuple[str, Any, EndpointResponse]] = []
+        for endpoint, result in zip(SNAPSHOT_ENDPOINTS, results, strict=True):
+            if isinstance(result, BaseException):
+                print(f"Failed to load {endpoint}: {result!r}")
+            elif result is not None:
+                loaded.append((endpoint, *result))
+        parsed = {endpoint: data for endpoint, data, _ in loaded}
+        changed = self.update_universe(parsed.get("cards"), parsed.get("achievements"))
+        # Only now can the same responses be skipped next time
+        for endpoint, _, response in loaded:
+            self.accept_response(endpoint, response)
+        return changed
+
+    def update_universe(
+        self: DataGenerator, cards: list[Card] | None, achievements: list[Achievement] | None
+    ) -> bool:
+        """Replace the card and achievement universes, returning True if anything changed.
+
+        Only images belonging to changed cards are removed from the caches, and stored
+        images are deleted once nothing uses them.
+
+        Args:
+        ----
+        cards (list): The new cards, or None to keep the current cards
+        achievements (list): The new achievements, or None to keep the current achievements
+        """
+        old_paths = self._image_paths()
+        changed = False
+        if cards is not None:
+            card_universe = {card.text_id: card for card in cards}
+            changed_cards = [
+                card
+                for card_id, card in self.card_universe.items()
+                if card_id not in card_universe or card_universe[card_id] != card
+            ]
+            for card in changed_cards:
+                self._invalidate_image(card.token_image_url)
+            if self.atlas is not None and any(
+                card.text_id in self.atlas.index for card in changed_cards
+            ):
+                self.atlas = None
+            changed = bool(changed_cards) or card_universe.keys() != self.card_universe.keys()
+            self.card_universe = card_universe
+            self.card_index = SearchIndex(
+                (card.rarityName, card) for card in card_universe.values()
+            )
+            self.card_names = card_names(card_universe.values())
+
+        if achievements is not None:
+            old_achievements = {
+                (achievement.achievement_id, achievement.index): achievement
+                for achievement in self.achievement_universe
+            }
+            for achievement in achievements:
+                old = old_achievements.get((achievement.achievement_id, achievement.index))
+                if old is None or old != achievement:
+                    changed = True
+                    if old is not None and old.image_url:
+                        self._invalidate_image(old.image_url)
+            changed = changed or len(achievements) != len(self.achievement_universe)
+            self.achievement_universe = achievements
+            self.achievement_levels = group_achievements(achievements)
+            self.achievement_names = {}
+            for levels in self.achievement_levels.values():
+                self.achievement_names.setdefault(normalize(levels[0].name), levels)
+            self.achievement_index = SearchIndex(
+                (levels[0].name, levels) for levels in self.achievement_names.values()
+            )
+
+        if changed:
+            self.universe_version += 1
+            # Renders from the old version can never be used again
+            self.deck_cache.clear()
+            for path in old_paths - self._image_paths():
+                self._invalidate_image(path)
+                if self.disk_cache is not None:
+                    self.disk_cache.remove(path)
+        return changed
+
+    def _image_paths(self: DataGenerator) -> set[str]:
+        """Get the path of every card and achievement image."""
+        return {
+            self._normalize_path(card.token_image_url) for card in self.card_universe.values()
+        } | {
+            self._normalize_path(achievement.image_url)
+            for achievement in self.achievement_universe
+            if achievement.image_url
+        }
+
+    def _invalidate_image(self: DataGenerator, path: str) -> None:
+        """Remove an image from the memory caches and check the stored copy next time it is used.
+
+        Args:
+        ----
+        path (str): The path to the image
+        """
+        path = self._normalize_path(path)
+        self.cache.pop(path)
+        if self.compressed_cache is not None:
+            self.compressed_cache.pop(path)
+        self.tile_cache.pop(path)
+        self._revalidated.discard(path)
+
+    def start_warmup(self: DataGenerator, concurrency: int) -> Task[None]:
+        """Prepare images in the background so they are ready before they are used.
+
+        Args:
+        ----
+        concurrency (int): The most images to download at once
+        """
+        task = create_task(self.warmup(concurrency))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def warmup(self: DataGenerator, concurrency: int) -> None:
+        """Prefetch images, then build the card atlas if there is an atlas directory.
+
+        Warmups started while another is running wait for it to finish.
+
+        Args:
+        ----
+        concurrency (int): The most images to download at once
+        """
+        async with self._warmup_lock:
+            if self.atlas_directory is None:
+                await self.prefetch_images(concurrency)
+                return
+            if self.open_atlas():
+                # Card tiles are already in the atlas, but their images may have changed
+                await self.prefetch_images(concurrency, cards=False)
+                await self.revalidate_card_images(concurrency)
+                return
+            await self.prefetch_images(concurrency)
+            await self.build_atlas()
+
+    async def prefetch_images(self: DataGenerator, concurrency: int, *, cards: bool = True) -> None:
+        """Download every card and achievement image so they are ready before they are used.
+
+        Args:
+        ----
+        concurrency (int): The most images to download at once
+        cards (bool): If card images should be downloaded as well as achievement images
+        """
+        start = time()
+        limit = Semaphore(concurrency)
+        tile_paths = (
+            {card.token_image_url for card in self.card_universe.values()} if cards else set()
+        )
+        image_paths = {
+            achievement.image_url
+            for achievement in self.achievement_universe
+            if achievement.image_url
+        }
+        progress = (
+            tqdm(total=len(tile_paths) + len(image_paths), desc="Prefetching images")
+            if has_progression
+            else None
+        )
+
+        async def fetch(path: str, *, tile: bool) -> None:
+            async with limit:
+                await (self.get_tile(path) if tile else self.get_image(path))
+            if progress is not None:
+                progress.update()
+
+        await gather(
+            *(fetch(path, tile=True) for path in tile_paths),
+            *(fetch(path, tile=False) for path in image_paths),
+        )
+        if progress is not None:
+            progress.close()
+        print(
+            f"Prefetched {len(tile_paths) + len(image_paths)} images "
+            + f"in {round(time() - start, 2)}s"
+        )
+
+    async def revalidate_card_images(self: DataGenerator, concurrency: int) -> None:
+        """Check every stored card image is current, rebuilding the atlas if any have changed.
 
-        for card in await self.load_cards():
-            self.card_universe[card.text_id] = card
-        for achievement in await self.load_achievements():
-            self.achievement_universe.append(achievement)
+        Card images are only checked when they are loaded, which never happens while the
+        atlas has their tiles.
+
+        Args:
+        ----
+        concurrency (int): The most images to check at once
+        """
+        disk_cache = self.disk_cache
+        if disk_cache is None:
+            return
+        limit = Semaphore(concurrency)
+
+        async def revalidate(path: str) -> None:
+            validators = disk_cache.read_meta(path)
+            if validators is None or path in self._revalidated:
+                return
+            self._revalidated.add(path)
+            async with limit:
+                await self._revalidate_image(path, validators)
+
+        await gather(*(revalidate(path) for path in self._card_image_paths()))
+
+    def _card_image_paths(self: DataGenerator) -> set[str]:
+        """Get the path of every card image."""
+        return {self._normalize_path(card.token_image_url) for card in self.card_universe.values()}
+
+    def _start_atlas_rebuild(self: DataGenerator) -> None:
+        """Build a new atlas in the background once any running warmup finishes."""
+        if self.atlas_directory is None:
+            return
+        task = create_task(self._rebuild_atlas())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _rebuild_atlas(self: DataGenerator) -> None:
+        """Build a new atlas unless the current one has the latest card images."""
+        async with self._warmup_lock:
+            if self.atlas is None or self.atlas.path != self._atlas_path():
+                await self.build_atlas()
+
+    def _atlas_path(self: DataGenerator) -> Path:
+        """Get the atlas file for the current card images."""
+        if self.atlas_directory is None:
+            no_directory = "No atlas directory"
+            raise ValueError(no_directory)
+        # Identify the atlas by each card's image and, if known, its version on the server
+        key = sha256()
+        for card_id in sorted(self.card_universe):
+            path = self._normalize_path(self.card_universe[card_id].token_image_url)
+            validators = self.disk_cache.read_meta(path) if self.disk_cache else None
+            key.update(dumps([card_id, path, validators], sort_keys=True).encode())
+        return self.atlas_directory / f"{key.hexdigest()}.rgba"
+
+    def open_atlas(self: DataGenerator) -> bool:
+        """Use an existing atlas for the current card images, returning False if there isn't one."""
+        path = self._atlas_path()
+        if not path.exists():
+            return False
+        self._use_atlas(path, sorted(self.card_universe))
+        return True
+
+    async def build_atlas(self: DataGenerator) -> None:
+        """Write every card's deck tile to an atlas and use it for rendering decks.
+
+        Gives up if the cards change while the atlas is being built.
+        """
+        # The atlas is named after the cards its tiles are loaded for
+        version = self.universe_version
+        cards = [self.card_universe[card_id] for card_id in sorted(self.card_universe)]
+        path = self._atlas_path()
+        tiles = await gather(*(self.get_tile(card.token_image_url) for card in cards))
+        if self.universe_version != version:
+            return
+        if not all(self.has_tile(card) for card in cards):
+            return  # Some images failed to load
+
+        if not path.exists():
+            try:
+                await to_thread(CardAtlas.write, path, tiles, TILE_SIZE)
+            except OSError:
+                return
+            if self.universe_version != version:
+                return
+        self._use_atlas(path, [card.text_id for card in cards])
+
+    def _use_atlas(self: DataGenerator, path: Path, card_ids: list[str]) -> None:
+        """Render decks from an atlas, deleting atlases for older card images.
+
+        Args:
+        ----
+        path (Path): The atlas file
+        card_ids (list): The card ids in the order their tiles were written
+        """
+        self.atlas = CardAtlas(path, card_ids, TILE_SIZE)
+        # The tiles live in the atlas now
+        self.tile_cache.clear()
+        for stale_path in path.parent.glob("*.rgba"):
+            if stale_path != path:
+                with suppress(OSError):
+                    stale_path.unlink()
+
+    def _normalize_path(self: DataGenerator, path: str) -> str:
+        """Convert an image url to a path on the server.
+
+        Args:
+        ----
+        path (str): The url or path to the image
+        """
+        url = self.http_session._base_url
+        if url:
+            path = path.removeprefix(str(url.origin())).removeprefix(
+                str(url.origin()).replace("https", "http")
+            )
+        if not path.startswith("/"):
+            path = "/" + path
+        return path
+
+    def has_tile(self: DataGenerator, card: Card) -> bool:
+        """Check if a card's deck tile is ready.
+
+        Args:
+        ----
+        card (Card): The card to check
+        """
+        if self.atlas is not None and card.text_id in self.atlas.index:
+            return True
+        return self._normalize_path(card.token_image_url) in self.tile_cache
+
+    async def get_tile(self: DataGenerator, path: str) -> Image.Image:
+        """Get an image from the server scaled to a deck tile.
+
+        Args:
+        ----
+        path (str): The path to the image
+        """
+        path = self._normalize_path(path)
+        tile = self.tile_cache.get(path)
+        if tile is not None:
+            return tile
+
+        # Share one tile between everyone waiting on the same card, such as copies in a deck
+        pending = self._pending_tiles.get(path)
+        if pending is None:
+            pending = create_task(self._build_tile(path))
+            self._pending_tiles[path] = pending
+            pending.add_done_callback(lambda _: self._pending_tiles.pop(path, None))
+        return await shield(pending)
+
+    async def _build_tile(self: DataGenerator, path: str) -> Image.Image:
+        """Scale an image to a deck tile, then add it to the cache.
+
+        Args:
+        ----
+        path (str): The path to the image
+        """
+        image = await self.get_image(path)
+        # Scaling runs in a thread so it doesn't hold up the event loop
+        tile = await to_thread(make_tile, image)
+        if image.width and image.height:
+            self.tile_cache.put(path, tile)
+        return tile
 
     async def get_image(self: DataGenerator, path: str) -> Image.Image:
         """Get an image from the server.
@@ -196,53 +793,207 @@ class DataGenerator:
         ----
         path (str): The path to the image
         """
+        path = self._normalize_path(path)
+        image = self.cache.get(path)
+        if image is not None:
+            return image
+        content = self.compressed_cache.get(path) if self.compressed_cache is not None else None
+        if content is not None:
+            image = await to_thread(decode_image, content)
+            if image is not None:
+                self.cache.put(path, image)
+                return image
+
+        # Share one download between everyone waiting on the same image
+        pending = self._pending_images.get(path)
+        if pending is None:
+            pending = create_task(self._fetch_image(path))
+            self._pending_images[path] = pending
+            pending.add_done_callback(lambda _: self._pending_images.pop(path, None))
+        return await shield(pending)
+
+    async def _fetch_image(self: DataGenerator, path: str) -> Image.Image:
+        """Load an image from disk or the server, then add it to the cache.
+
+        Args:
+        ----
+        path (str): The path to the image
+        """
+        stored = self.disk_cache.read(path) if self.disk_cache else None
+        if stored is None:
+            content = await self._download_image(path)
+        else:
+            content, validators = stored
+            # Use the stored copy straight away and check it is still current in the background
+            if path not in self._revalidated:
+                self._revalidated.add(path)
+                task = create_task(self._revalidate_image(path, validators))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+
+        image = await to_thread(decode_image, content) if content is not None else None
+        if content is None or image is None:
+            return Image.new("RGBA", (0, 0))
+        if self.compressed_cache is not None:
+            self.compressed_cache.put(path, content)
+        self.cache.put(path, image)
+        return image
+
+    async def _download_image(
+        self: DataGenerator, path: str, validators: dict[str, str] | None = None
+    ) -> bytes | None:
+        """Download an image and store it on disk.
+
+        Returns None if the download failed or the stored copy is still valid.
+
+        Args:
+        ----
+        path (str): The path to the image
+        validators (dict): The ETag and Last-Modified headers of the stored copy
+        """
+        headers = {}
+        if validators is not None:
+            if "ETag" in validators:
+                headers["If-None-Match"] = validators["ETag"]
+            if "Last-Modified" in validators:
+                headers["If-Modified-Since"] = validators["Last-Modified"]
         try:
-            url = self.http_session._base_url
-            if url:
-                path = path.removeprefix(str(url.origin())).removeprefix(
-                    str(url.origin()).replace("https", "http")
-                )
-            if not path.startswith("/"):
-                path = "/" + path
-
-            if path in self.cache.keys():
-                return self.cache[path]
-            async with self.http_session.get(path) as response:
-                self.cache[path] = Image.open(BytesIO(await response.content.read()))
+            async with self.http_session.get(path, headers=headers) as response:
+                if response.status == 304:
+                    return None
+                content = await response.content.read()
                 if not response.ok:
-                    return Image.new("RGBA", (0, 0))
-            return self.cache[path]
-        except Image.UnidentifiedImageError:
-            return Image.new("RGBA", (0, 0))
+                    return None
+        except (ClientError, TimeoutError):
+            return None
+        if self.disk_cache:
+            self.disk_cache.write(path, content, response.headers)
+        return content
+
+    async def _revalidate_image(self: DataGenerator, path: str, validators: dict[str, str]) -> None:
+        """Check a stored image is current, replacing it if it has changed.
+
+        Args:
+        ----
+        path (str): The path to the image
+        validators (dict): The ETag and Last-Modified headers of the stored copy
+        """
+        content = await self._download_image(path, validators)
+        if content is None:
+            return
+        image = await to_thread(decode_image, content)
+        if image is None:
+            return
+        if path in self._card_image_paths():
+            # The atlas has the old tile
+            self.atlas = None
+            self._start_atlas_rebuild()
+        self.tile_cache.pop(path)
+        if self.compressed_cache is not None and self.compressed_cache.pop(path) is not None:
+            self.compressed_cache.put(path, content)
+        if self.cache.pop(path) is not None:
+            self.cache.put(path, image)
+
+    async def fetch_if_changed(self: DataGenerator, endpoint: str) -> EndpointResponse | None:
+        """Get json from the api, returning None if it failed or hasn't changed since last time.
+
+        Requests are conditional on the last accepted response's ETag or Last-Modified
+        headers, and responses identical to it are not parsed.
+
+        Args:
+        ----
+        endpoint (str): The api endpoint to get
+        """
+        headers = {}
+        validators = self._endpoint_validators.get(endpoint, {})
+        if "ETag" in validators:
+            headers["If-None-Match"] = validators["ETag"]
+        if "Last-Modified" in validators:
+            headers["If-Modified-Since"] = validators["Last-Modified"]
+        try:
+            async with self.http_session.get(endpoint, headers=headers) as response:
+                if response.status == 304:
+                    return None
+                content = await response.content.read()
+                if not response.ok:
+                    return None
+                validators = {
+                    header: response.headers[header]
+                    for header in ("ETag", "Last-Modified")
+                    if header in response.headers
+                }
+        except (ClientError, TimeoutError):
+            return None
+
+        if sha256(content).hexdigest() == self._endpoint_hashes.get(endpoint):
+            self._endpoint_validators[endpoint] = validators
+            return None
+        try:
+            return EndpointResponse(content, validators, loads(content.decode()))
+        except (JSONDecodeError, UnicodeDecodeError):
+            return None
+
+    def accept_response(self: DataGenerator, endpoint: str, response: EndpointResponse) -> None:
+        """Mark a response as used, so it isn't loaded again until it changes.
 
-    async def load_cards(self: DataGenerator) -> list[Card]:
-        """Load all card data."""
-        cards = []
-        async with self.http_session.get("cards") as response:
-            content = await response.content.read()
-            if not response.ok:
-                return []
-
-        iterator = loads(content.decode())
-        if has_progression:
-            iterator = tqdm(iterator, "Loading cards")
-
-        for card in iterator:
-            cards.append(get_card(card))
-        return cards
-
-    async def load_achievements(self: DataGenerator) -> list[Achievement]:
-        """Load all achievement data."""
-        achievements = []
-        async with self.http_session.get("achievements") as response:
-            content = await response.content.read()
-            if not response.ok:
-                return []
-
-        iterator = loads(content.decode())
-        if has_progression:
-            iterator = tqdm(iterator, "Loading achievements")
-
-        for achievement in iterator:
-            achievements.append(Achievement(achievement))
-        return achievements
+        Call once the response's data has been parsed and applied.
+
+        Args:
+        ----
+        endpoint (str): The api endpoint the response is from
+        response (EndpointResponse): The response that was used
+        """
+        self._endpoint_validators[endpoint] = response.validators
+        self._endpoint_hashes[endpoint] = response.content_hash
+        if self.snapshot_cache is not None and endpoint in SNAPSHOT_ENDPOINTS:
+            self.snapshot_cache.write(endpoint, compress(response.content), response.validators)
+
+    async def load_cards(self: DataGenerator) -> tuple[list[Card], EndpointResponse] | None:
+        """Load all card data, returning None if it couldn't be loaded or hasn't changed.
+
+        The response must be accepted once the cards are in use.
+        """
+        response = await self.fetch_if_changed("cards")
+        return None if response is None else (parse_cards(response.data), response)
+
+    async def load_achievements(
+        self: DataGenerator,
+    ) -> tuple[list[Achievement], EndpointResponse] | None:
+        """Load all achievement data, returning None if it couldn't be loaded or hasn't changed.
+
+        The response must be accepted once the achievements are in use.
+        """
+        response = await self.fetch_if_changed("achievements")
+        return None if response is None else (parse_achievements(response.data), response)
+
+    def load_snapshot(self: DataGenerator) -> bool:
+        """Load cards and achievements from the last snapshot, returning True if there was one.
+
+        The snapshot's validators are kept, so the next reload is a conditional request.
+        """
+        if self.snapshot_cache is None:
+            return False
+        # Nothing is kept unless every endpoint loads, otherwise the next reload could skip
+        # an endpoint that was never loaded
+        responses: dict[str, EndpointResponse] = {}
+        for endpoint in SNAPSHOT_ENDPOINTS:
+            stored = self.snapshot_cache.read(endpoint)
+            if stored is None:
+                return False
+            try:
+                content = decompress(stored[0])
+                data = loads(content.decode())
+            except (OSError, EOFError, JSONDecodeError, UnicodeDecodeError):
+                return False
+            validators = {header: value for header, value in stored[1].items() if header != "key"}
+            responses[endpoint] = EndpointResponse(content, validators, data)
+        try:
+            cards = parse_cards(responses["cards"].data)
+            achievements = parse_achievements(responses["achievements"].data)
+        except (KeyError, TypeError, ValueError):
+            return False
+        self.update_universe(cards, achievements)
+        for endpoint, response in responses.items():
+            self._endpoint_validators[endpoint] = response.validators
+            self._endpoint_hashes[endpoint] = response.content_hash
+        return True
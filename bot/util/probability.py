@@ -1,11 +1,19 @@
 """Calculate probability of certain events, by Allophony on discord."""
 
+from __future__ import annotations
+
+from contextlib import suppress
+from functools import cache, lru_cache
 from math import comb
 
+import numpy as np
+
 deck_size = 42
 opening_hand_size = 7
+max_draws = deck_size - opening_hand_size
 
 
+@cache
 def allophony_formula(hermits: int, hand_size: int, desired: int, deck_size: int) -> float:
     """Allophony maths (idk)."""
     return (
@@ -15,6 +23,7 @@ def allophony_formula(hermits: int, hand_size: int, desired: int, deck_size: int
     )
 
 
+@cache
 def initial_hand_chance(hermits_in_deck: int, desired_hermits: int) -> float:
     """Get the chance of having `desired_hermits` hermits
     in your inital hand when you have `hermits_in_deck` in your deck.
@@ -54,3 +63,116 @@ def probability(hermits_in_deck: int, draws: int, desired_hermits: int) -> float
                 for k in range(desired_hermits - i, min(draws + 1, hermits_in_deck - i + 1))
             )
     return res
+
+
+def probabilities(hermits_in_deck: int, desired_hermits: int) -> np.ndarray:
+    """Get the probability of having x hermits in your hands after each number of draws.
+
+    Results are remembered, and each value is calculated by `probability`, so they are
+    identical to calling it for every draw count.
+
+    Args:
+    ----
+    hermits_in_deck (int): The number of hermits in the deck
+    desired_hermits (int): The target hermit count
+    """
+    # Wanting no hermits is the same as wanting fewer, and more than a deck holds is never met
+    return _probability_row(hermits_in_deck, min(max(desired_hermits, 0), deck_size + 1))
+
+
+@lru_cache(maxsize=4096)
+def _probability_row(hermits_in_deck: int, desired_hermits: int) -> np.ndarray:
+    """Calculate the probability of having x hermits after each number of draws."""
+    row = np.full(max_draws + 1, np.nan)
+    for draws in range(max_draws + 1):
+        # Left as nan where the formula is undefined, with too many hermits for a deck
+        with suppress(ValueError):
+            row[draws] = probability(hermits_in_deck, draws, desired_hermits)
+    row.flags.writeable = False
+    return row
+
+
+class DrawCategory:
+    """A kind of card to draw, such as hermits or items of a type."""
+
+    def __init__(self: DrawCategory, name: str, count: int, minimum: int) -> None:
+        """Describe a kind of card to draw.
+
+        Args:
+        ----
+        name (str): The name of the category
+        count (int): The number of cards of this category in the deck
+        minimum (int): The fewest cards of this category wanted in hand
+        """
+        self.name: str = name
+        self.count: int = count
+        self.minimum: int = minimum
+
+
+def parse_categories(text: str, deck_size: int) -> list[DrawCategory]:
+    """Read categories written like "hermits=12:2, miner=8:1".
+
+    Each category is a name, the number in the deck and the fewest wanted in hand,
+    which is 1 if left out.
+
+    Args:
+    ----
+    text (str): The categories, separated by commas
+    deck_size (int): The number of cards in the deck
+    """
+    categories: list[DrawCategory] = []
+    for part in text.split(","):
+        invalid_category = f'Invalid category "{part.strip()}", use name=count:minimum'
+        name, _, numbers = part.partition("=")
+        count, _, minimum = numbers.partition(":")
+        try:
+            category = DrawCategory(name.strip(), int(count), int(minimum or 1))
+        except ValueError:
+            raise ValueError(invalid_category) from None
+        if not category.name or category.count < 0 or not 0 <= category.minimum <= category.count:
+            raise ValueError(invalid_category)
+        categories.append(category)
+    if sum(category.count for category in categories) > deck_size:
+        too_many = f"There are more than {deck_size} cards in those categories"
+        raise ValueError(too_many)
+    return categories
+
+
+@lru_cache(maxsize=65536)
+def _hands(counts: tuple[int, ...], minimums: tuple[int, ...], others: int, drawn: int) -> int:
+    """Count the hands with at least the minimum of each category.
+
+    Args:
+    ----
+    counts (tuple): The number of cards in each category
+    minimums (tuple): The fewest cards wanted from each category
+    others (int): The number of cards in no category
+    drawn (int): The number of cards in the hand
+    """
+    if not counts:
+        return comb(others, drawn)
+    return sum(
+        comb(counts[0], taken) * _hands(counts[1:], minimums[1:], others, drawn - taken)
+        for taken in range(minimums[0], min(counts[0], drawn) + 1)
+    )
+
+
+def draw_chance(categories: list[DrawCategory], deck_size: int, drawn: int) -> float:
+    """Get the chance of drawing at least the minimum of every category.
+
+    Args:
+    ----
+    categories (list): The categories of card wanted
+    deck_size (int): The number of cards in the deck
+    drawn (int): The number of cards drawn
+    """
+    if not 0 <= drawn <= deck_size:
+        return 0
+    counts = tuple(category.count for category in categories)
+    hands = _hands(
+        counts,
+        tuple(category.minimum for category in categories),
+        deck_size - sum(counts),
+        drawn,
+    )
+    return hands / comb(deck_size, drawn)
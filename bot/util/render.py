@@ -0,0 +1,264 @@
+"""Run image rendering away from the event loop."""
+
+from __future__ import annotations
+
+from asyncio import get_running_loop
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from time import time
+from typing import TypeVar
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+T = TypeVar("T")
+
+IMAGE_FORMATS = ("png", "palette", "webp")
+# Progressively smaller encodings to try when an image is too large
+FALLBACK_FORMATS = (("palette", 9), ("webp", 80), ("webp", 50))
+
+
+class EncodedImage:
+    """An encoded image ready to upload."""
+
+    def __init__(self: EncodedImage, data: bytes, extension: str) -> None:
+        """Store an encoded image.
+
+        Args:
+        ----
+        data (bytes): The encoded image
+        extension (str): The file extension for the image format
+        """
+        self.data: bytes = data
+        self.extension: str = extension
+
+    def filename(self: EncodedImage, name: str) -> str:
+        """Get a file name for the image.
+
+        Args:
+        ----
+        name (str): The file name without an extension
+        """
+        return f"{name}.{self.extension}"
+
+
+class ImageEncoder:
+    """Encode images with configurable format and size limits."""
+
+    def __init__(self: ImageEncoder, image_format: str, level: int, max_bytes: int) -> None:
+        """Encode images with configurable format and size limits.
+
+        Args:
+        ----
+        image_format (str): "png", "palette" for a 256 color png, or "webp"
+        level (int): The zlib level for png images, or the quality for webp images
+        max_bytes (int): The largest allowed image, falls back to smaller formats if exceeded
+        """
+        if image_format not in IMAGE_FORMATS:
+            invalid_format = "Invalid image format: " + image_format
+            raise ValueError(invalid_format)
+        self.image_format: str = image_format
+        self.level: int = level
+        self.max_bytes: int = max_bytes
+
+    def encode(self: ImageEncoder, im: Image.Image) -> EncodedImage:
+        """Encode an image, trying smaller formats if it is too large.
+
+        Returns the smallest encoding if none fit.
+
+        Args:
+        ----
+        im (Image): The image to encode
+        """
+        attempts: list[EncodedImage] = []
+        for image_format, level in ((self.image_format, self.level), *FALLBACK_FORMATS):
+            encoded = encode_image(im, image_format, level)
+            if len(encoded.data) <= self.max_bytes:
+                return encoded
+            attempts.append(encoded)
+        return min(attempts, key=lambda encoded: len(encoded.data))
+
+
+def encode_image(im: Image.Image, image_format: str, level: int) -> EncodedImage:
+    """Encode an image in the given format.
+
+    Args:
+    ----
+    im (Image): The image to encode
+    image_format (str): "png", "palette" for a 256 color png, or "webp"
+    level (int): The zlib level for png images, or the quality for webp images
+    """
+    with BytesIO() as im_binary:
+        if image_format == "webp":
+            im.save(im_binary, "WEBP", quality=level)
+            return EncodedImage(im_binary.getvalue(), "webp")
+        if image_format == "palette":
+            im = im.quantize(256, Image.Quantize.FASTOCTREE)
+        im.save(im_binary, "PNG", compress_level=level)
+        return EncodedImage(im_binary.getvalue(), "png")
+
+
+def figure_image(figure: Figure) -> Image.Image:
+    """Draw a matplotlib figure to an image.
+
+    Args:
+    ----
+    figure (Figure): The figure to draw
+    """
+    canvas = figure.canvas
+    if not isinstance(canvas, FigureCanvasAgg):
+        canvas = FigureCanvasAgg(figure)
+    canvas.draw()
+    return Image.frombuffer(
+        "RGBA", canvas.get_width_height(), canvas.buffer_rgba(), "raw", "RGBA", 0, 1
+    ).copy()
+
+
+def render_chart(draw: Callable[..., Figure], encoder: ImageEncoder, *args: object) -> EncodedImage:
+    """Draw a chart and encode it.
+
+    Charts are drawn on their own figure without pyplot, so several can be drawn at once.
+
+    Args:
+    ----
+    draw (Callable): Create the chart's figure from the remaining arguments
+    encoder (ImageEncoder): How to encode the image
+    *args (object): Arguments to pass to draw
+    """
+    return encoder.encode(figure_image(draw(*args)))
+
+
+def render_deck(
+    tiles: list[Image.Image], width: int, height: int, tile_size: int, encoder: ImageEncoder
+) -> EncodedImage:
+    """Arrange deck tiles in a grid and encode the result.
+
+    Args:
+    ----
+    tiles (list): The card tiles, in the order they should appear
+    width (int): The number of tiles in each row
+    height (int): The number of rows
+    tile_size (int): The width and height of each tile
+    encoder (ImageEncoder): How to encode the image
+    """
+    im = Image.new("RGBA", (width * tile_size, height * tile_size))
+    for i, tile in enumerate(tiles):
+        im.paste(tile, ((i % width) * tile_size, (i // width) * tile_size), tile)
+    return encoder.encode(im)
+
+
+def _timed(func: Callable[..., T], *args: object) -> tuple[T, float, float]:
+    """Run a function, returning the result with the start and end times."""
+    started = time()
+    result = func(*args)
+    return result, started, time()
+
+
+class StageTiming:
+    """Time spent on a stage of rendering."""
+
+    def __init__(self: StageTiming) -> None:
+        """Time spent on a stage of rendering."""
+        self.count: int = 0
+        self.queued: float = 0
+        self.working: float = 0
+        self.last_queued: float = 0
+        self.last_working: float = 0
+
+    def record(self: StageTiming, queued: float, working: float) -> None:
+        """Add a run of this stage.
+
+        Args:
+        ----
+        queued (float): Seconds spent waiting for a worker
+        working (float): Seconds spent running
+        """
+        self.count += 1
+        self.queued += queued
+        self.working += working
+        self.last_queued = queued
+        self.last_working = working
+
+
+class RenderPool:
+    """A pool of workers for rendering images without blocking the event loop."""
+
+    def __init__(self: RenderPool, kind: str, workers: int) -> None:
+        """Create a pool of workers for rendering images.
+
+        Args:
+        ----
+        kind (str): Either "thread" or "process"
+        workers (int): The number of workers in the pool
+        """
+        self.executor: Executor
+        if kind == "process":
+            self.executor = ProcessPoolExecutor(workers)
+        elif kind == "thread":
+            self.executor = ThreadPoolExecutor(workers, "render")
+        else:
+            invalid_kind = "Invalid render pool kind: " + kind
+            raise ValueError(invalid_kind)
+
+        self.timings: dict[str, StageTiming] = {}
+
+    def record(self: RenderPool, stage: str, queued: float, working: float) -> None:
+        """Record the time taken by a stage of rendering.
+
+        Args:
+        ----
+        stage (str): The name of the stage
+        queued (float): Seconds spent waiting for a worker
+        working (float): Seconds spent running
+        """
+        self.timings.setdefault(stage, StageTiming()).record(queued, working)
+
+    async def run(self: RenderPool, stage: str, func: Callable[..., T], *args: object) -> T:
+        """Run a function in the pool and record how long it took.
+
+        The function and its arguments must be picklable when using a process pool.
+
+        Args:
+        ----
+        stage (str): The name of the stage, used to group timings
+        func (Callable): The function to run
+        *args (object): Arguments to pass to the function
+        """
+        submitted = time()
+        result, started, finished = await get_running_loop().run_in_executor(
+            self.executor, _timed, func, *args
+        )
+        self.record(stage, started - submitted, finished - started)
+        return result
+
+
+class ChartRenderer:
+    """Draw charts in a render pool."""
+
+    def __init__(self: ChartRenderer, pool: RenderPool, encoder: ImageEncoder) -> None:
+        """Draw charts in a render pool.
+
+        Args:
+        ----
+        pool (RenderPool): The pool to draw charts in
+        encoder (ImageEncoder): How to encode the charts
+        """
+        self.pool: RenderPool = pool
+        self.encoder: ImageEncoder = encoder
+
+    async def render(
+        self: ChartRenderer, draw: Callable[..., Figure], *args: object
+    ) -> EncodedImage:
+        """Draw and encode a chart without blocking the event loop.
+
+        The draw function must create a new `Figure` rather than use pyplot, and with its
+        arguments must be picklable when using a process pool.
+
+        Args:
+        ----
+        draw (Callable): Create the chart's figure from the remaining arguments
+        *args (object): Arguments to pass to draw
+        """
+        return await self.pool.run("chart render", render_chart, draw, self.encoder, *args)
@@ -0,0 +1,270 @@
+"""Search names by prefix, substring and similar spelling."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from re import compile as re_compile
+from typing import Generic, TypeVar
+
+Item = TypeVar("Item")
+
+# Queries are matched on n-grams of up to this many characters
+GRAM_SIZE = 3
+# Only the words sharing the most bigrams with a misspelt word have their spelling compared
+FUZZY_CANDIDATES = 32
+# Misspelt queries are cut to this many words, each at most this long
+FUZZY_WORDS = 4
+FUZZY_WORD_LENGTH = 32
+
+word_pattern = re_compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase text and collapse runs of whitespace, so equivalent names compare equal.
+
+    Args:
+    ----
+    text (str): The text to normalize
+    """
+    return " ".join(text.lower().split())
+
+
+def ngrams(text: str, size: int) -> set[str]:
+    """Get every substring of a given length.
+
+    Args:
+    ----
+    text (str): The text to split
+    size (int): The length of each substring
+    """
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def max_edits(word: str) -> int:
+    """Get the number of typos allowed in a word.
+
+    Args:
+    ----
+    word (str): The word as typed
+    """
+    return min(3, (len(word) + 1) // 4)
+
+
+def substring_distance(query: str, text: str) -> int:
+    """Get the fewest edits that turn a query into part of some text.
+
+    Insertions, deletions, substitutions and swapping neighbouring characters are one edit each.
+    Uses the bit-parallel algorithm from Hyyrö's "A bit-vector algorithm for computing
+    Levenshtein and Damerau edit distances", with a bit for each character of the query.
+
+    Args:
+    ----
+    query (str): The text to find
+    text (str): The text to search in
+    """
+    length = len(query)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    # The positions in the query of each character
+    positions: dict[str, int] = {}
+    for i, char in enumerate(query):
+        positions[char] = positions.get(char, 0) | 1 << i
+
+    vertical_up, vertical_down, diagonal, previous = full, 0, 0, 0
+    distance = best = length
+    for char in text:
+        matches = positions.get(char, 0)
+        x = matches | vertical_down
+        swaps = ((~diagonal & matches) << 1) & previous
+        diagonal = ((((x & vertical_up) + vertical_up) ^ vertical_up) | x | swaps) & full
+        horizontal_up = vertical_down | (~(diagonal | vertical_up) & full)
+        horizontal_down = vertical_up & diagonal
+        if horizontal_up & last:
+            distance += 1
+        elif horizontal_down & last:
+            distance -= 1
+        # The query can start anywhere in the text, so nothing is shifted in
+        horizontal_up = (horizontal_up << 1) & full
+        horizontal_down = (horizontal_down << 1) & full
+        vertical_up = horizontal_down | (~(diagonal | horizontal_up) & full)
+        vertical_down = horizontal_up & diagonal
+        previous = matches
+        best = min(best, distance)
+    return best
+
+
+class SearchIndex(Generic[Item]):
+    """Find items by name, ignoring case and tolerating typos."""
+
+    def __init__(self: SearchIndex[Item], items: Iterable[tuple[str, Item]]) -> None:
+        """Index items by name.
+
+        Results keep the order items are given in.
+
+        Args:
+        ----
+        items (Iterable): Pairs of a name and the item it belongs to
+        """
+        self.names: list[str] = []
+        self.items: list[Item] = []
+        for name, item in items:
+            self.names.append(name)
+            self.items.append(item)
+        self.lower_names: list[str] = [name.lower() for name in self.names]
+
+        self._prefixes: list[tuple[str, int]] = sorted(
+            (name, i) for i, name in enumerate(self.lower_names)
+        )
+        # The positions of the names containing each n-gram, in order
+        self._grams: dict[str, list[int]] = {}
+        for i, name in enumerate(self.lower_names):
+            for size in range(1, GRAM_SIZE + 1):
+                for gram in ngrams(name, size):
+                    self._grams.setdefault(gram, []).append(i)
+
+        # Misspellings are matched against the distinct words in the names, of which there
+        # are far fewer than names
+        self._words: list[str] = []
+        self._word_names: list[list[int]] = []
+        self._name_words: list[list[int]] = []
+        word_positions: dict[str, int] = {}
+        for i, name in enumerate(self.lower_names):
+            self._name_words.append([])
+            for word in dict.fromkeys(word_pattern.findall(name)):
+                if word not in word_positions:
+                    word_positions[word] = len(self._words)
+                    self._words.append(word)
+                    self._word_names.append([])
+                self._word_names[word_positions[word]].append(i)
+                self._name_words[i].append(word_positions[word])
+        self._word_grams: dict[str, list[int]] = {}
+        for i, word in enumerate(self._words):
+            for gram in ngrams(word, 2):
+                self._word_grams.setdefault(gram, []).append(i)
+
+    def __len__(self: SearchIndex[Item]) -> int:
+        """Get the number of items in the index."""
+        return len(self.items)
+
+    def prefix_matches(self: SearchIndex[Item], query: str) -> list[int]:
+        """Get the positions of items whose name starts with a lowercase query.
+
+        Args:
+        ----
+        query (str): The lowercase start of the name
+        """
+        matches: list[int] = []
+        for name, i in self._prefixes[bisect_left(self._prefixes, (query, -1)) :]:
+            if not name.startswith(query):
+                break
+            matches.append(i)
+        return sorted(matches)
+
+    def substring_matches(self: SearchIndex[Item], query: str) -> Iterator[int]:
+        """Get the positions of items whose name contains a lowercase query, in order.
+
+        Args:
+        ----
+        query (str): The lowercase text to find
+        """
+        if len(query) <= GRAM_SIZE:
+            yield from self._grams.get(query, [])
+            return
+        # Only names containing the query's rarest n-gram need to be checked
+        candidates = min((self._grams.get(gram, []) for gram in ngrams(query, GRAM_SIZE)), key=len)
+        yield from (i for i in candidates if query in self.lower_names[i])
+
+    def similar_words(self: SearchIndex[Item], word: str) -> dict[int, int]:
+        """Get the known words containing something spelt like a lowercase word.
+
+        Returns the position of each word with the number of typos.
+
+        Args:
+        ----
+        word (str): The lowercase word as typed
+        """
+        word = word[:FUZZY_WORD_LENGTH]
+        allowed = max_edits(word)
+        if allowed == 0:
+            return {i: 0 for i, known in enumerate(self._words) if word in known}
+        shared = Counter[int]()
+        for gram in ngrams(word, 2):
+            shared.update(self._word_grams.get(gram, []))
+        words: dict[int, int] = {}
+        for i, _ in shared.most_common(FUZZY_CANDIDATES):
+            distance = substring_distance(word, self._words[i])
+            if distance <= allowed:
+                words[i] = distance
+        return words
+
+    def fuzzy_matches(self: SearchIndex[Item], query: str, limit: int) -> list[int]:
+        """Get the positions of items with words spelt like each word of a lowercase query.
+
+        Closest matches come first.
+
+        Args:
+        ----
+        query (str): The lowercase text to find
+        limit (int): The most positions to return
+        """
+        similar = [self.similar_words(word) for word in word_pattern.findall(query)[:FUZZY_WORDS]]
+        if not similar:
+            return []
+        # Start from the query word found in the fewest names, then narrow those names down
+        similar.sort(key=lambda words: sum(len(self._word_names[i]) for i in words))
+        typos: dict[int, int] = {}
+        for i, distance in similar[0].items():
+            for name in self._word_names[i]:
+                typos[name] = min(typos.get(name, distance), distance)
+        for words in similar[1:]:
+            narrowed: dict[int, int] = {}
+            for name, count in typos.items():
+                distances = [words[i] for i in self._name_words[name] if i in words]
+                if distances:
+                    narrowed[name] = count + min(distances)
+            typos = narrowed
+        return sorted(typos, key=lambda name: (typos[name], name))[:limit]
+
+    def fuzzy_search(self: SearchIndex[Item], query: str, limit: int) -> list[Item]:
+        """Find items with names containing something spelt like the query, closest first.
+
+        Args:
+        ----
+        query (str): The text to search for
+        limit (int): The most items to return
+        """
+        return [self.items[i] for i in self.fuzzy_matches(query.lower(), limit)]
+
+    def search(
+        self: SearchIndex[Item], query: str, limit: int, *, fuzzy: bool = True
+    ) -> list[Item]:
+        """Find items by name, putting names that start with the query first.
+
+        Args:
+        ----
+        query (str): The text to search for
+        limit (int): The most items to return
+        fuzzy (bool): If there is room left, add names spelt like the query
+        """
+        query = query.lower()
+        if not query:
+            return self.items[:limit]
+        prefixes = self.prefix_matches(query)
+        results = prefixes[:limit]
+        if len(results) < limit:
+            found = set(prefixes)
+            for i in self.substring_matches(query):
+                if i not in found:
+                    results.append(i)
+                    if len(results) == limit:
+                        break
+        if fuzzy and len(results) < limit:
+            found = set(results)
+            results.extend(
+                i
+                for i in self.fuzzy_matches(query, limit - len(results) + len(found))
+                if i not in found
+            )
+        return [self.items[i] for i in results[:limit]]
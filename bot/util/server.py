@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+from asyncio import Task, create_task, gather, wait_for
+from collections.abc import Callable
 from datetime import datetime as dt
 from datetime import timezone
 from json import JSONDecodeError, loads
+from pathlib import Path
 from time import time
 from typing import Any
 
@@ -12,7 +15,11 @@ from aiohttp import ClientSession, ContentTypeError
 from interactions import Client, Embed, Member, Snowflake
 from PIL import Image
 
+from bot.config import CONFIG
+from bot.util.cache import DiskCache, LruCache
 from bot.util.datagen import Achievement, DataGenerator, hex_to_int
+from bot.util.render import ChartRenderer, EncodedImage, ImageEncoder, RenderPool
+from bot.util.search import normalize
 
 
 class GamePlayer:
@@ -142,7 +149,16 @@ class Server:
     def create_session(self: Server) -> None:
         """Create http session and data generator."""
         self.http_session = ClientSession(self.server_url + "/api/")
-        self.data_generator = DataGenerator(self.http_session)
+        self.data_generator = DataGenerator(
+            self.http_session,
+            CONFIG.IMAGE_CACHE_BYTES,
+            CONFIG.TILE_CACHE_BYTES,
+            CONFIG.DECK_CACHE_BYTES,
+            DiskCache(Path(CONFIG.IMAGE_CACHE_DIR, str(self.server_id))),
+            Path(CONFIG.ATLAS_DIR, str(self.server_id)) if CONFIG.ATLAS_DIR else None,
+            DiskCache(Path(CONFIG.SNAPSHOT_DIR, str(self.server_id))),
+            CONFIG.COMPRESSED_CACHE_BYTES if CONFIG.IMAGE_STORAGE == "compressed" else None,
+        )
 
     def authorize_user(self: Server, member: Member, *, allow_dotd: bool = False) -> bool:
         """Check if a user is allowed to use privileged commands."""
@@ -284,26 +300,25 @@ class Server:
 
     async def get_type_icons(self: Server) -> dict[str, Image.Image] | None:
         """Get a dictionary of type icons."""
-        if self.type_data is not None:
-            return self.type_data
-        try:
-            async with self.http_session.get("types") as response:
-                if not response.ok:
-                    return None
-                data: list[dict[str, str]] = await response.json()
-        except (
-            ConnectionError,
-            JSONDecodeError,
-            ContentTypeError,
-            KeyError,
-        ):
-            return None
-        self.type_data = {
-            hermit_type["type"]: await self.data_generator.get_image(hermit_type["icon"])
-            for hermit_type in data
-        }
+        if self.type_data is None:
+            await self.refresh_type_icons()
         return self.type_data
 
+    async def refresh_type_icons(self: Server) -> bool:
+        """Reload the type icons if they have changed on the server, returning True if they have."""
+        response = await self.data_generator.fetch_if_changed("types")
+        if response is None:
+            return False
+        try:
+            self.type_data = {
+                hermit_type["type"]: await self.data_generator.get_image(hermit_type["icon"])
+                for hermit_type in response.data
+            }
+        except KeyError:
+            return False
+        self.data_generator.accept_response("types", response)
+        return True
+
     async def get_game_stats(self: Server) -> tuple[int, str] | None:
         """Get number of games and average length."""
         try:
@@ -402,6 +417,23 @@ class ServerManager:
 
         self.client = client
         self.servers = servers
+        self.render_pool = RenderPool(CONFIG.RENDER_POOL, CONFIG.RENDER_WORKERS)
+        self._background_tasks: set[Task[None]] = set()
+        self.load_times: dict[Snowflake, float] = {}
+        self.autocomplete_cache: LruCache[tuple[str, Snowflake, int, str], list[str]] = LruCache(
+            CONFIG.AUTOCOMPLETE_CACHE_SIZE
+        )
+        # Probability graphs only depend on the command's options, so are shared by every server
+        self.graph_cache: LruCache[tuple[int, int], tuple[EncodedImage, list[float]]] = LruCache(
+            CONFIG.GRAPH_CACHE_BYTES, lambda graph: len(graph[0].data)
+        )
+        self.deck_encoder = ImageEncoder(
+            CONFIG.DECK_IMAGE_FORMAT, CONFIG.DECK_IMAGE_LEVEL, CONFIG.DECK_IMAGE_MAX_BYTES
+        )
+        self.chart_encoder = ImageEncoder(
+            CONFIG.CHART_IMAGE_FORMAT, CONFIG.CHART_IMAGE_LEVEL, CONFIG.CHART_IMAGE_MAX_BYTES
+        )
+        self.charts = ChartRenderer(self.render_pool, self.chart_encoder)
 
     def get_server(self: ServerManager, guild_id: Snowflake | None) -> Server:
         """Get a server by its discord guild id.
@@ -416,13 +448,97 @@ class ServerManager:
             else self.servers[0]
         )
 
+    def autocomplete(
+        self: ServerManager,
+        server: Server,
+        kind: str,
+        text: str,
+        search: Callable[[str], list[str]],
+    ) -> list[str]:
+        """Get autocomplete options, reusing the options from the last time the text was typed.
+
+        Args:
+        ----
+        server (Server): The server the options are from
+        kind (str): What is being autocompleted, options are cached separately for each kind
+        text (str): The text typed so far
+        search (Callable): Find the options for normalized text
+        """
+        text = normalize(text)
+        key = (kind, server.server_id, server.data_generator.universe_version, text)
+        options = self.autocomplete_cache.get(key)
+        if options is None:
+            options = search(text)
+            self.autocomplete_cache.put(key, options)
+        return options
+
     async def close_all_sessions(self: ServerManager) -> None:
         """Close all server ClientSessions."""
         for server in self.servers:
             await server.http_session.close()
 
+    async def refresh_server(self: ServerManager, server: Server) -> None:
+        """Reload card, achievement and type data for a server if it has changed.
+
+        Args:
+        ----
+        server (Server): The server to refresh
+        """
+        changed = await server.data_generator.reload_all()
+        if changed:
+            self.autocomplete_cache.clear()
+        if server.type_data is not None:
+            await server.refresh_type_icons()
+        if changed and CONFIG.PREFETCH_CONCURRENCY > 0:
+            server.data_generator.start_warmup(CONFIG.PREFETCH_CONCURRENCY)
+
+    async def _timed_refresh(self: ServerManager, server: Server) -> float:
+        """Refresh a server, giving up after the load timeout, and return how long it took."""
+        start = time()
+        await wait_for(self.refresh_server(server), CONFIG.SERVER_LOAD_TIMEOUT)
+        return time() - start
+
+    async def refresh_servers(self: ServerManager, servers: list[Server]) -> None:
+        """Refresh servers at the same time, so a slow or broken server doesn't hold up the rest.
+
+        Args:
+        ----
+        servers (list[Server]): The servers to refresh
+        """
+        results = await gather(
+            *(self._timed_refresh(server) for server in servers), return_exceptions=True
+        )
+        for server, result in zip(servers, results, strict=True):
+            if isinstance(result, float):
+                self.load_times[server.server_id] = result
+                print(f"Loaded {server.server_id} in {result:.2f}s")
+            elif isinstance(result, TimeoutError):
+                print(f"Loading {server.server_id} timed out")
+            else:
+                print(f"Failed to load {server.server_id}: {result!r}")
+
+    async def refresh_all(self: ServerManager) -> None:
+        """Reload card, achievement and type data for servers where it has changed."""
+        await self.refresh_servers(self.servers)
+
     async def reload_all_generators(self: ServerManager) -> None:
-        """Close all server DataGenerators."""
+        """Close all server DataGenerators.
+
+        Servers with a snapshot start from it and load from the network in the background.
+        """
+        snapshot_servers: list[Server] = []
+        network_servers: list[Server] = []
         for server in self.servers:
             server.create_session()
-            await server.data_generator.reload_all()
+            if server.data_generator.load_snapshot():
+                snapshot_servers.append(server)
+                if CONFIG.PREFETCH_CONCURRENCY > 0:
+                    server.data_generator.start_warmup(CONFIG.PREFETCH_CONCURRENCY)
+            else:
+                network_servers.append(server)
+
+        if snapshot_servers:
+            task = create_task(self.refresh_servers(snapshot_servers))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+        await self.refresh_servers(network_servers)
@@ -0,0 +1,115 @@
+"""Simulate shuffled decks to find when hermits can attack."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from bot.util.datagen import Card, HermitCard, ItemCard
+from bot.util.probability import opening_hand_size
+
+TRIALS = 100_000
+
+
+class AttackReadiness:
+    """The chance each hermit in a deck can attack by each turn."""
+
+    def __init__(self: AttackReadiness, hermits: list[HermitCard], chances: np.ndarray) -> None:
+        """Store the chance each hermit in a deck can attack by each turn.
+
+        Args:
+        ----
+        hermits (list): The distinct hermits in the deck
+        chances (ndarray): Indexed by hermit, attack (primary then secondary) and turn - 1
+        """
+        self.hermits: list[HermitCard] = hermits
+        self.chances: np.ndarray = chances
+
+
+def _first_seen(ready: np.ndarray) -> np.ndarray:
+    """Get how many cards must be seen before a condition holds in each trial.
+
+    Trials where it never holds get one more than the number of cards checked.
+
+    Args:
+    ----
+    ready (ndarray): If the condition holds after seeing each number of cards, by trial
+    """
+    first = ready.argmax(axis=1) + 1
+    first[~ready.any(axis=1)] = ready.shape[1] + 1
+    return first
+
+
+def simulate_attacks(
+    deck: list[Card], turns: int, trials: int = TRIALS, seed: int | None = None
+) -> AttackReadiness:
+    """Find the chance each hermit in a deck has the items for each attack by each turn.
+
+    Opening hands without a hermit are redrawn, and one card is drawn every turn after
+    the first. Items only need to be in hand, the limit of one attached item a turn is ignored.
+
+    Args:
+    ----
+    deck (list): The cards in the deck
+    turns (int): The number of turns to simulate
+    trials (int): The number of shuffles to simulate
+    seed (int): Seed for the shuffles, giving the same result every time if set
+    """
+    rng = np.random.default_rng(seed)
+    deck_size = len(deck)
+    # Cards seen by the end of the last turn
+    seen = min(deck_size, opening_hand_size + turns - 1)
+
+    hermits = list({card.text_id: card for card in deck if isinstance(card, HermitCard)}.values())
+    chances = np.zeros((len(hermits), 2, turns))
+    if not hermits:
+        return AttackReadiness(hermits, chances)
+
+    orders = rng.permuted(np.tile(np.arange(deck_size), (trials, 1)), axis=1)
+    is_hermit = np.array([isinstance(card, HermitCard) for card in deck])
+    hand_size = min(opening_hand_size, deck_size)
+    while True:
+        redraw = ~is_hermit[orders[:, :hand_size]].any(axis=1)
+        if not redraw.any():
+            break
+        orders[redraw] = rng.permuted(orders[redraw], axis=1)
+    orders = orders[:, :seen]
+
+    # Energy of each type provided by each card, by position in each shuffle
+    energy_types = sorted(
+        {energy for card in deck if isinstance(card, ItemCard) for energy in card.energy}
+    )
+    card_energy = np.zeros((deck_size, len(energy_types) + 1), np.int16)
+    for i, card in enumerate(deck):
+        if isinstance(card, ItemCard):
+            for energy in card.energy:
+                card_energy[i, energy_types.index(energy)] += 1
+            card_energy[i, -1] = len(card.energy)
+    # Total energy of each type after each number of cards seen, the last column is all types
+    energy_seen = card_energy[orders].cumsum(axis=1, dtype=np.int16)
+
+    # Attacks with the same cost are ready at the same time
+    energy_ready: dict[tuple[str, ...], np.ndarray] = {}
+    for hermit in hermits:
+        for attack in hermit.attacks:
+            cost = tuple(sorted(attack["cost"]))
+            if cost in energy_ready:
+                continue
+            ready = np.ones((trials, seen), bool)
+            for energy in set(cost) - {"any"}:
+                if energy not in energy_types:
+                    ready[:] = False
+                    break
+                ready &= energy_seen[:, :, energy_types.index(energy)] >= cost.count(energy)
+            ready &= energy_seen[:, :, -1] >= len(cost)
+            energy_ready[cost] = _first_seen(ready)
+
+    cards_seen = np.minimum(opening_hand_size + np.arange(turns), seen)
+    for h, hermit in enumerate(hermits):
+        hermit_seen = _first_seen(
+            np.isin(orders, [i for i, card in enumerate(deck) if card.text_id == hermit.text_id])
+        )
+        for a, attack in enumerate(hermit.attacks):
+            attack_seen = np.maximum(hermit_seen, energy_ready[tuple(sorted(attack["cost"]))])
+            counts = np.bincount(attack_seen, minlength=seen + 2).cumsum()
+            chances[h, a] = counts[cards_seen] / trials
+    return AttackReadiness(hermits, chances)